@@ -8,4 +8,7 @@ class RedirectionError(Exception):
     pass
 
 class UnexpectedError(Exception):
+    pass
+
+class CircuitOpenError(Exception):
     pass
\ No newline at end of file
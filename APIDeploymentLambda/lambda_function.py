@@ -1,20 +1,79 @@
 import requests
 import csv
+import gzip
+import hashlib
+import json
 import os
+import shutil
 import time
-import boto3
 
-from Exceptions.my_exceptions import RedirectionError, ClientError, ServerError, UnexpectedError
+from Exceptions.my_exceptions import RedirectionError, ClientError, ServerError, UnexpectedError, CircuitOpenError
 
-def fetch_weather(key, city="Bengaluru", time_out=3, retries=3, delay=2):
-    url = "https://api.openweathermap.org/data/2.5/weather"
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Overridable so the function can run outside Lambda (see local_runner.py):
+# a scratch directory standing in for /tmp, and a stub weather API.
+TMP_DIR = os.environ.get("LAMBDA_TMP_DIR", "/tmp")
+WEATHER_API_URL = os.environ.get("WEATHER_API_URL", "https://api.openweathermap.org/data/2.5/weather")
+
+def decode_json(response):
+    # orjson is optional in the deployment package; requests' own decoder
+    # is used when it isn't bundled.
+    if orjson is None:
+        return response.json()
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        # Same exception as response.json(), so the retry loop treats a
+        # non-JSON body (an HTML 502 page, say) like a network error.
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+
+# Per-container circuit breaker: once the upstream has failed
+# BREAKER_THRESHOLD times in a row, a warm container fails fast for
+# BREAKER_RESET_TIMEOUT seconds, then lets a single trial call through.
+BREAKER_THRESHOLD = int(os.environ.get("BREAKER_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("BREAKER_RESET_TIMEOUT", "30"))
+breaker = {"failures": 0, "opened_at": None}
+
+def breaker_before_call():
+    if breaker["opened_at"] is None:
+        return
+    if time.time() - breaker["opened_at"] < BREAKER_RESET_TIMEOUT:
+        raise CircuitOpenError("Circuit open, weather API calls suspended")
+    # Half-open: one more failure re-opens the circuit straight away.
+    breaker["opened_at"] = None
+    breaker["failures"] = BREAKER_THRESHOLD - 1
+
+def breaker_record(success):
+    if success:
+        breaker["failures"] = 0
+        breaker["opened_at"] = None
+        return
+    breaker["failures"] += 1
+    if breaker["failures"] >= BREAKER_THRESHOLD:
+        breaker["opened_at"] = time.time()
+
+def fetch_weather(key, city="Bengaluru", time_out=3, retries=3, delay=2, state=None):
+    # `state` is this city's entry from the change-detection state. It is
+    # updated in place, and None is returned when the observation hasn't
+    # changed since the previous invocation.
+    url = WEATHER_API_URL
     headers = {"Content-Type": "application/json"}
+    if state is not None:
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
     payload = {
         "q": city,
         "appid": key
     }
 
     for attempt in range(1, retries + 1):
+        breaker_before_call()
         try:
             response = requests.get(
                 url,
@@ -22,21 +81,43 @@ def fetch_weather(key, city="Bengaluru", time_out=3, retries=3, delay=2):
                 params=payload,
                 timeout=time_out
             )
+            if state is not None and response.status_code == 304:
+                breaker_record(True)
+                return None
 
+            status = response.status_code
             if "charset=utf-8" not in response.headers.get("Content-Type", ""):
+                breaker_record(not 500 <= status < 600)
                 raise Exception("Invalid encoding format")
 
-            status = response.status_code
-            data = response.json()
+            # Recorded once the body has decoded: a body that isn't JSON
+            # raises a RequestException, recorded as one failure below.
+            data = decode_json(response)
+            breaker_record(not 500 <= status < 600)
 
             if 200 <= status < 300:
                 if "main" in data:
                     weather = data['main']
-                    return {
+                    observation = {
                         "city": city,
                         "weather": data['weather'][0]['description'],
                         **weather
                     }
+                    if state is not None:
+                        body = json.dumps(observation, sort_keys=True)
+                        digest = hashlib.sha1(body.encode("utf-8")).hexdigest()
+                        if "dt" in data:
+                            unchanged = state.get("dt") == data["dt"]
+                        else:
+                            unchanged = state.get("hash") == digest
+                        state.update({"dt": data.get("dt"), "hash": digest})
+                        if response.headers.get("ETag"):
+                            state["etag"] = response.headers["ETag"]
+                        if response.headers.get("Last-Modified"):
+                            state["last_modified"] = response.headers["Last-Modified"]
+                        if unchanged:
+                            return None
+                    return observation
                 else:
                     if attempt == retries:
                         raise Exception("Weather data not received")
@@ -61,29 +142,67 @@ def fetch_weather(key, city="Bengaluru", time_out=3, retries=3, delay=2):
                 time.sleep(delay)
 
         except requests.exceptions.Timeout:
+            breaker_record(False)
             if attempt == retries:
                 raise
             time.sleep(delay)
 
         except requests.exceptions.RequestException:
+            breaker_record(False)
             if attempt == retries:
                 raise Exception(f'Network error after maximum retries: {retries}')
             time.sleep(delay)
 
-def write_to_csv(weather_data, filename="/tmp/weather.csv"):
+# Set CSV_NAME=weather.csv.gz to upload the CSV gzipped. Rows are still
+# appended to a plain CSV in /tmp; the whole file is compressed in one go
+# before each upload, since a gzip member per row would be larger than
+# the plain text.
+CSV_NAME = os.environ.get("CSV_NAME", "weather.csv")
+
+def local_csv_path():
+    name = CSV_NAME[:-len(".gz")] if CSV_NAME.endswith(".gz") else CSV_NAME
+    return os.path.join(TMP_DIR, name)
+
+def gzip_file(filename):
+    with open(filename, mode="rb") as source, gzip.open(f"{filename}.gz", mode="wb", compresslevel=6) as target:
+        shutil.copyfileobj(source, target)
+    return f"{filename}.gz"
+
+def write_to_csv(weather_data, filename=None):
+    filename = filename or local_csv_path()
     file_exists = os.path.exists(filename)
-    with open(filename, 
-              mode="a" if file_exists else "w",
-              encoding="utf-8",
-              newline="") as file:
+    with open(filename, mode="a" if file_exists else "w", encoding="utf-8", newline="") as file:
         writer = csv.DictWriter(file, fieldnames=weather_data.keys())
         if not file_exists:
             writer.writeheader()
         writer.writerow(weather_data)
 
+def load_state(filename=None):
+    # /tmp survives between invocations of a warm container, so repeated
+    # polls from the same container can skip unchanged observations.
+    filename = filename or os.path.join(TMP_DIR, "weather_state.json")
+    try:
+        with open(filename, mode="r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state, filename=None):
+    filename = filename or os.path.join(TMP_DIR, "weather_state.json")
+    with open(filename, mode="w", encoding="utf-8") as file:
+        json.dump(state, file)
+
+# Created on first upload and reused by warm invocations.
+s3_client = None
+
 def upload_to_s3(local_path, bucket, key):
-    s3 = boto3.client('s3')
-    s3.upload_file(local_path, bucket, key)
+    # boto3 takes a large share of the cold start and is only needed when
+    # there is new data to upload.
+    global s3_client
+    if s3_client is None:
+        import boto3
+        s3_client = boto3.client('s3')
+    s3_client.upload_file(local_path, bucket, key)
 
 def lambda_handler(event, context):
     # Get API key from environment variable
@@ -101,14 +220,27 @@ def lambda_handler(event, context):
         }
     city = event.get("city", "Bengaluru")
     try:
-        weather_data = fetch_weather(key=key, city=city, time_out=3)
-        local_csv_path = "/tmp/weather.csv"
-        write_to_csv(weather_data, filename=local_csv_path)
-        s3_key = f"weather.csv"
-        upload_to_s3(local_csv_path, bucket, s3_key)
+        state = load_state()
+        weather_data = fetch_weather(key=key, city=city, time_out=3, state=state.setdefault(city, {}))
+        s3_key = CSV_NAME
+        if weather_data is None:
+            save_state(state)
+            return {
+                "statusCode": 200,
+                "body": f"No new weather data for {city}, S3 upload skipped",
+                "changed": False,
+                "s3_path": f"s3://{bucket}/{s3_key}"
+            }
+        csv_path = local_csv_path()
+        write_to_csv(weather_data, filename=csv_path)
+        if CSV_NAME.endswith(".gz"):
+            csv_path = gzip_file(csv_path)
+        upload_to_s3(csv_path, bucket, s3_key)
+        save_state(state)
         return {
             "statusCode": 200,
             "body": f"Weather data for {city} saved to S3://{bucket}/{s3_key}",
+            "changed": True,
             "data": weather_data,
             "s3_path": f"s3://{bucket}/{s3_key}"
         }
@@ -117,6 +249,11 @@ def lambda_handler(event, context):
             "statusCode": 504,
             "body": "API call timed out"
         }
+    except CircuitOpenError as e:
+        return {
+            "statusCode": 503,
+            "body": str(e)
+        }
     except Exception as e:
         return {
             "statusCode": 500,
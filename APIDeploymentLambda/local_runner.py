@@ -0,0 +1,338 @@
+"""Run lambda_handler locally under concurrency.
+
+Invokes the handler across a process pool, one process per simulated
+container. Each container has its own scratch directory as /tmp and gets a
+fake context with a deadline. The weather API and S3 are replaced by local
+stub servers. From the APIDeploymentLambda directory:
+
+    python local_runner.py --invocations 500 --concurrency 8
+    python local_runner.py --invocations 200 --concurrency 8 --container-lifetime 1
+    python local_runner.py --change-rate 0 --api-latency 50
+
+A container imports lambda_function on its first invocation (a cold start,
+timed as init) and keeps it for later ones (warm starts), together with its
+/tmp state and S3 client. --container-lifetime N retires a container after
+N invocations, so N=1 makes every invocation cold. --change-rate is the
+fraction of weather responses carrying a new observation; unchanged ones
+let warm containers skip the CSV write and the S3 upload.
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CITIES = ["Bengaluru", "Delhi", "Mumbai", "Chennai", "Kolkata"]
+BUCKET = "local-weather-bucket"
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handler):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.lock = threading.Lock()
+        self.requests = Counter()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class WeatherStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        city = parse_qs(urlparse(self.path).query).get("q", ["Bengaluru"])[0]
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        observed = self.server.observation_time(city)
+        body = json.dumps({
+            "weather": [{"id": 721, "main": "Haze", "description": "haze", "icon": "50d"}],
+            "main": {"temp": 305.2, "feels_like": 308.1, "temp_min": 304.0, "temp_max": 306.5,
+                     "pressure": 1006, "humidity": 52, "sea_level": 1006, "grnd_level": 912},
+            "dt": observed,
+            "name": city,
+            "cod": 200
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class WeatherStub(StubServer):
+    """OpenWeatherMap stand-in. Each response carries a new observation
+    time with probability `change_rate`, otherwise the city's last one."""
+
+    def __init__(self, latency=0.0, change_rate=1.0, seed=0):
+        super().__init__(WeatherStubHandler)
+        self.latency = latency
+        self.change_rate = change_rate
+        self.rng = random.Random(seed)
+        self.observed = {}
+
+    def observation_time(self, city):
+        with self.lock:
+            self.requests["GET"] += 1
+            if city not in self.observed or self.rng.random() < self.change_rate:
+                self.observed[city] = self.observed.get(city, 1750000000) + 600
+            return self.observed[city]
+
+
+class S3StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_body(self):
+        if "chunked" in self.headers.get("Transfer-Encoding", ""):
+            body = b""
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    # trailers, then the blank line ending the message
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    return body
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def reply(self, status, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_PUT(self):
+        body = self.read_body()
+        with self.server.lock:
+            self.server.requests["PUT"] += 1
+            self.server.bytes_received += len(body)
+            self.server.objects[urlparse(self.path).path] = len(body)
+        self.reply(200, [("ETag", f'"{uuid.uuid4().hex}"')])
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests["GET"] += 1
+        self.reply(404)
+
+    do_HEAD = do_GET
+
+
+class S3Stub(StubServer):
+    """Counts S3 requests and keeps the size of each uploaded object."""
+
+    def __init__(self):
+        super().__init__(S3StubHandler)
+        self.bytes_received = 0
+        self.objects = {}
+
+
+class LocalS3Client:
+    """The one S3 call the function makes (PutObject via upload_file), sent
+    to the stand-in. Only used when boto3 isn't installed; with boto3 the
+    real client is pointed at the stand-in through AWS_ENDPOINT_URL_S3."""
+
+    def __init__(self, endpoint):
+        self.endpoint = urlparse(endpoint)
+
+    def upload_file(self, filename, bucket, key):
+        conn = http.client.HTTPConnection(self.endpoint.hostname, self.endpoint.port, timeout=10)
+        try:
+            with open(filename, mode="rb") as file:
+                conn.request("PUT", f"/{bucket}/{key}", body=file.read())
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 300:
+                raise OSError(f"S3 upload failed: {response.status} {response.reason}")
+        finally:
+            conn.close()
+
+
+class FakeContext:
+    """The parts of the Lambda context object handlers use."""
+
+    def __init__(self, timeout, memory_limit_in_mb=128, function_name="weather-fetch"):
+        self.function_name = function_name
+        self.function_version = "$LATEST"
+        self.invoked_function_arn = f"arn:aws:lambda:local:000000000000:function:{function_name}"
+        self.memory_limit_in_mb = memory_limit_in_mb
+        self.aws_request_id = str(uuid.uuid4())
+        self.log_group_name = f"/aws/lambda/{function_name}"
+        self.log_stream_name = f"local/{os.getpid()}"
+        self.deadline = time.monotonic() + timeout
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self.deadline - time.monotonic()) * 1000))
+
+
+# Per-container (per-process) state
+lambda_function = None
+
+
+def start_container(env, run_root):
+    os.environ.update(env)
+    os.environ["LAMBDA_TMP_DIR"] = tempfile.mkdtemp(prefix=f"container-{os.getpid()}-", dir=run_root)
+    sys.path.insert(0, HERE)
+    if importlib.util.find_spec("boto3") is None:
+        boto3 = types.ModuleType("boto3")
+        boto3.client = lambda service, **kwargs: LocalS3Client(os.environ["AWS_ENDPOINT_URL_S3"])
+        sys.modules["boto3"] = boto3
+
+
+def invoke(event, timeout):
+    global lambda_function
+    cold = lambda_function is None
+    init_ms = 0.0
+    if cold:
+        started = time.perf_counter()
+        import lambda_function
+        init_ms = (time.perf_counter() - started) * 1000
+
+    context = FakeContext(timeout)
+    started = time.perf_counter()
+    try:
+        result = lambda_function.lambda_handler(event, context)
+        status = result.get("statusCode")
+        changed = result.get("changed")
+    except Exception as e:
+        status = type(e).__name__
+        changed = None
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "container": os.getpid(),
+        "cold": cold,
+        "init_ms": init_ms,
+        "duration_ms": duration_ms,
+        "status": status,
+        "changed": changed,
+        # A real Lambda would have stopped the invocation at the deadline.
+        "timed_out": context.get_remaining_time_in_millis() == 0
+    }
+
+
+def run(invocations=200, concurrency=4, cities=CITIES, container_lifetime=None, timeout=5.0,
+        api_latency=0.0, change_rate=1.0, seed=0):
+    weather = WeatherStub(api_latency, change_rate, seed).start()
+    s3 = S3Stub().start()
+    run_root = tempfile.mkdtemp(prefix="lambda-runner-")
+    env = {
+        "WEATHER_API_URL": f"{weather.url}/data/2.5/weather",
+        "WEATHER_API_KEY": "local",
+        "S3_BUCKET": BUCKET,
+        "AWS_ENDPOINT_URL_S3": s3.url,
+        "AWS_ACCESS_KEY_ID": "local",
+        "AWS_SECRET_ACCESS_KEY": "local",
+        "AWS_DEFAULT_REGION": "us-east-1"
+    }
+    tasks = [({"city": cities[n % len(cities)]}, timeout) for n in range(invocations)]
+
+    try:
+        # spawn, not fork: every container starts from a fresh interpreter
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(concurrency, initializer=start_container, initargs=(env, run_root),
+                          maxtasksperchild=container_lifetime) as pool:
+            started = time.perf_counter()
+            results = pool.starmap(invoke, tasks, chunksize=1)
+            elapsed = time.perf_counter() - started
+    finally:
+        weather.stop()
+        s3.stop()
+        shutil.rmtree(run_root, ignore_errors=True)
+
+    latencies = [result["init_ms"] + result["duration_ms"] for result in results]
+    cold = [result for result in results if result["cold"]]
+    warm = [result for result in results if not result["cold"]]
+    return {
+        "invocations": len(results),
+        "elapsed_s": elapsed,
+        "invocations_per_s": len(results) / elapsed if elapsed else 0.0,
+        "containers": len({result["container"] for result in results}),
+        "cold_starts": len(cold),
+        "init_avg_ms": sum(result["init_ms"] for result in cold) / len(cold) if cold else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies, default=0.0),
+        "cold_p50_ms": percentile([result["init_ms"] + result["duration_ms"] for result in cold], 50),
+        "warm_p50_ms": percentile([result["duration_ms"] for result in warm], 50),
+        "statuses": Counter(result["status"] for result in results),
+        "changed": sum(1 for result in results if result["changed"]),
+        "timed_out": sum(1 for result in results if result["timed_out"]),
+        "weather_requests": weather.requests["GET"],
+        "s3_requests": dict(s3.requests),
+        "s3_bytes": s3.bytes_received
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run lambda_handler locally under concurrency")
+    parser.add_argument("--invocations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4, help="number of simulated containers")
+    parser.add_argument("--cities", nargs="+", default=CITIES)
+    parser.add_argument("--container-lifetime", type=int, default=None,
+                        help="invocations before a container is replaced (1 = always cold)")
+    parser.add_argument("--timeout", type=float, default=5.0, help="function timeout in seconds")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="stub weather API latency in ms")
+    parser.add_argument("--change-rate", type=float, default=1.0,
+                        help="fraction of weather responses with a new observation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = run(args.invocations, args.concurrency, args.cities, args.container_lifetime,
+                 args.timeout, args.api_latency / 1000, args.change_rate, args.seed)
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(result["statuses"].items(), key=str))
+    s3_requests = ", ".join(f"{method} {count}" for method, count in sorted(result["s3_requests"].items()))
+    print(f"Invocations:   {result['invocations']} in {result['elapsed_s']:.2f}s "
+          f"({result['invocations_per_s']:.1f}/s) across {result['containers']} containers")
+    print(f"Statuses:      {statuses}; {result['changed']} changed, {result['timed_out']} past the deadline")
+    print(f"Cold starts:   {result['cold_starts']} (init avg {result['init_avg_ms']:.1f} ms, "
+          f"cold p50 {result['cold_p50_ms']:.1f} ms, warm p50 {result['warm_p50_ms']:.1f} ms)")
+    print(f"Latency:       p50 {result['p50_ms']:.1f} ms, p90 {result['p90_ms']:.1f} ms, "
+          f"p99 {result['p99_ms']:.1f} ms, max {result['max_ms']:.1f} ms")
+    print(f"Weather API:   {result['weather_requests']} requests")
+    print(f"S3:            {s3_requests or 'no requests'} ({result['s3_bytes']:,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import csv
+import gzip
+import json
+import os
+import subprocess
+import sys
+import pytest
+import requests
+from unittest.mock import Mock, patch
+import lambda_function
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def reset_breaker():
+    lambda_function.breaker.update({"failures": 0, "opened_at": None})
+    yield
+    lambda_function.breaker.update({"failures": 0, "opened_at": None})
+
+
+@pytest.fixture
+def container(tmp_path, monkeypatch):
+    # A fresh container: its own /tmp and no S3 client yet.
+    monkeypatch.setattr(lambda_function, "TMP_DIR", str(tmp_path))
+    monkeypatch.setenv("WEATHER_API_KEY", "key")
+    monkeypatch.setenv("S3_BUCKET", "bucket")
+    uploads = []
+    monkeypatch.setattr(lambda_function, "upload_to_s3", lambda path, bucket, key: uploads.append((path, key)))
+    return tmp_path, uploads
+
+
+def weather_response(dt=1750000600, status=200, temp=305.2):
+    body = {"weather": [{"description": "haze"}],
+            "main": {"temp": temp, "pressure": 1006, "humidity": 52, "temp_min": 304.0, "temp_max": 306.5},
+            "dt": dt}
+    if status >= 500:
+        body = {"message": "Internal Server Error"}
+    response = Mock()
+    response.status_code = status
+    response.headers = {"Content-Type": "application/json; charset=utf-8"}
+    response.content = json.dumps(body).encode("utf-8")
+    response.json.return_value = body
+    return response
+
+
+def test_tmp_dir_from_environment():
+    env = dict(os.environ, LAMBDA_TMP_DIR="/scratch/container-1")
+    result = subprocess.run([sys.executable, "-c", "import lambda_function; print(lambda_function.TMP_DIR)"],
+                            cwd=HERE, env=env, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "/scratch/container-1"
+
+
+def test_unchanged_observation_skips_upload(container):
+    tmp_path, uploads = container
+    responses = [weather_response(dt=1), weather_response(dt=1), weather_response(dt=2)]
+
+    with patch("requests.get", side_effect=responses) as mock_get:
+        results = [lambda_function.lambda_handler({"city": "Delhi"}, None) for _ in range(3)]
+
+    assert [(result["statusCode"], result["changed"]) for result in results] == [
+        (200, True), (200, False), (200, True)]
+    assert len(uploads) == 2
+    with open(tmp_path / "weather_state.json", encoding="utf-8") as file:
+        assert json.load(file)["Delhi"]["dt"] == 2
+    assert mock_get.call_count == 3
+
+
+def test_state_is_per_container(container):
+    tmp_path, uploads = container
+
+    with patch("requests.get", side_effect=[weather_response(dt=1), weather_response(dt=1)]):
+        lambda_function.lambda_handler({"city": "Delhi"}, None)
+        # A new container starts with an empty /tmp.
+        (tmp_path / "weather_state.json").unlink()
+        result = lambda_function.lambda_handler({"city": "Delhi"}, None)
+
+    assert result["changed"] is True
+    assert len(uploads) == 2
+
+
+def test_gzip_csv_uploads_one_member(container, monkeypatch):
+    tmp_path, uploads = container
+    monkeypatch.setattr(lambda_function, "CSV_NAME", "weather.csv.gz")
+    responses = [weather_response(dt=n, temp=300.0 + n % 7) for n in range(200)]
+
+    with patch("requests.get", side_effect=responses):
+        for _ in responses:
+            lambda_function.lambda_handler({"city": "Delhi"}, None)
+
+    uploaded = tmp_path / "weather.csv.gz"
+    with gzip.open(uploaded, mode="rt", encoding="utf-8", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["temp"] for row in rows[:2]] == ["300.0", "301.0"]
+    assert len(rows) == 200
+    # One gzip member for the whole file, a fraction of the plain CSV.
+    assert uploaded.read_bytes().count(b"\x1f\x8b\x08") == 1
+    assert uploaded.stat().st_size < (tmp_path / "weather.csv").stat().st_size / 4
+    assert {(path, key) for path, key in uploads} == {(str(uploaded), "weather.csv.gz")}
+
+
+def test_breaker_opens_and_fails_fast(container, monkeypatch):
+    # Three failed attempts within the first invocation open the circuit.
+    monkeypatch.setattr(lambda_function, "BREAKER_THRESHOLD", 3)
+    monkeypatch.setattr(lambda_function, "BREAKER_RESET_TIMEOUT", 30)
+
+    with patch("requests.get", return_value=weather_response(status=500)) as mock_get, \
+            patch("time.sleep"):
+        first = lambda_function.lambda_handler({"city": "Delhi"}, None)
+        second = lambda_function.lambda_handler({"city": "Delhi"}, None)
+
+    assert first["statusCode"] == 500
+    assert second["statusCode"] == 503
+    assert mock_get.call_count == 3
+    assert lambda_function.breaker["opened_at"] is not None
+
+
+def test_html_502_counts_once_per_attempt():
+    html_response = Mock()
+    html_response.status_code = 502
+    html_response.headers = {"Content-Type": "text/html; charset=utf-8"}
+    html_response.content = b"<html><body>502 Bad Gateway</body></html>"
+
+    with patch("requests.get", return_value=html_response), patch("time.sleep"):
+        with pytest.raises(Exception, match="Network error"):
+            lambda_function.fetch_weather("key", retries=3)
+
+    assert lambda_function.breaker["failures"] == 3
+    assert lambda_function.breaker["opened_at"] is None
+
+
+def test_breaker_half_open_trial_closes_on_success(container, monkeypatch):
+    monkeypatch.setattr(lambda_function, "BREAKER_THRESHOLD", 2)
+    lambda_function.breaker.update({"failures": 2, "opened_at": 0.0})
+
+    with patch("requests.get", return_value=weather_response()):
+        result = lambda_function.lambda_handler({"city": "Delhi"}, None)
+
+    assert result["statusCode"] == 200
+    assert lambda_function.breaker == {"failures": 0, "opened_at": None}
+
+
+def test_non_json_body_is_retried_like_network_error():
+    html_response = Mock()
+    html_response.status_code = 502
+    html_response.headers = {"Content-Type": "text/html; charset=utf-8"}
+    html_response.content = b"<html><body>502 Bad Gateway</body></html>"
+    html_response.json.side_effect = requests.exceptions.JSONDecodeError("Expecting value", "<html>", 0)
+
+    with patch('requests.get', return_value=html_response) as mock_get:
+        with pytest.raises(Exception, match="Network error after maximum retries"):
+            lambda_function.fetch_weather("key", retries=3, delay=0)
+
+    assert mock_get.call_count == 3
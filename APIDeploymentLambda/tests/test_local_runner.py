@@ -0,0 +1,33 @@
+import local_runner
+
+
+def test_run_uploads_every_new_observation():
+    result = local_runner.run(invocations=8, concurrency=2, cities=["Delhi", "Mumbai"], change_rate=1.0)
+
+    assert result["statuses"] == {200: 8}
+    assert result["changed"] == 8
+    assert result["s3_requests"] == {"PUT": 8}
+    assert result["weather_requests"] == 8
+    assert 1 <= result["containers"] <= 2
+    assert result["cold_starts"] == result["containers"]
+    assert result["timed_out"] == 0
+
+
+def test_run_skips_unchanged_observations_in_warm_containers():
+    # One container: only the first poll of each city is new to it.
+    result = local_runner.run(invocations=6, concurrency=1, cities=["Delhi", "Mumbai"], change_rate=0.0)
+
+    assert result["statuses"] == {200: 6}
+    assert (result["containers"], result["cold_starts"]) == (1, 1)
+    assert result["changed"] == 2
+    assert result["s3_requests"] == {"PUT": 2}
+
+
+def test_run_with_container_lifetime_one_is_always_cold():
+    result = local_runner.run(invocations=4, concurrency=2, cities=["Delhi"], container_lifetime=1, change_rate=0.0)
+
+    assert result["statuses"] == {200: 4}
+    assert result["cold_starts"] == 4
+    # Every container starts with an empty /tmp, so nothing looks unchanged.
+    assert result["changed"] == 4
+    assert result["s3_requests"] == {"PUT": 4}
@@ -8,4 +8,10 @@ class RedirectionError(Exception):
     pass
 
 class UnexpectedError(Exception):
+    pass
+
+class CircuitOpenError(Exception):
+    pass
+
+class ReaderTimeoutError(Exception):
     pass
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""Cold-start benchmark for the CLI and the Lambda handler.
+
+Run from the AdvancedAPIfetch directory:
+
+    python -m benchmarks.bench_coldstart
+    python -m benchmarks.bench_coldstart --runs 50 --imports
+
+Each target is started in a fresh interpreter `--runs` times, after one
+warm-up run so bytecode caches exist, as they do in a deployed package.
+Bare interpreter startup is measured too and subtracted. Every run is
+appended to --history (JSON; the default file is gitignored), and the
+medians are compared with the previous entry, so import-time regressions
+show up between commits.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDA_DIR = os.path.join(os.path.dirname(ROOT), "APIDeploymentLambda")
+HISTORY_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "coldstart_history.json")
+
+# name -> (working directory, interpreter arguments)
+TARGETS = {
+    "interpreter": (ROOT, ["-c", "pass"]),
+    "cli --help": (ROOT, ["-m", "src.cli", "--help"]),
+    "import src.main": (ROOT, ["-c", "import src.main"]),
+    "lambda handler import": (LAMBDA_DIR, ["-c", "import lambda_function"]),
+}
+
+
+def run_once(cwd, args):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=cwd, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(cwd, args, runs):
+    run_once(cwd, args)
+    timings = sorted(run_once(cwd, args) for _ in range(runs))
+    return {
+        "min_ms": round(timings[0], 2),
+        "median_ms": round(statistics.median(timings), 2),
+        "p90_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.9))], 2)
+    }
+
+
+def import_times(cwd, args):
+    """(depth, cumulative microseconds, module) from -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((depth, int(cumulative), name.strip()))
+    return imports
+
+
+def slowest_imports(cwd, args, top=8):
+    """The slowest imports of the target and of the modules it imports
+    directly, leaving out what the bare interpreter imports anyway."""
+    interpreter = {name for _, _, name in import_times(cwd, ["-c", "pass"])}
+    imports = [(cumulative, name) for depth, cumulative, name in import_times(cwd, args)
+               if depth <= 1 and name not in interpreter]
+    return sorted(imports, reverse=True)[:top]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(filename):
+    try:
+        with open(filename, mode="r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return []
+
+
+def save_history(history, filename):
+    temp_filename = f"{filename}.tmp"
+    with open(temp_filename, mode="w", encoding="utf-8") as file:
+        json.dump(history, file, indent=2)
+    os.replace(temp_filename, filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--history", default=HISTORY_FILENAME)
+    parser.add_argument("--no-save", action="store_true", help="don't append this run to the history")
+    parser.add_argument("--imports", action="store_true", help="list the slowest imports of each target")
+    args = parser.parse_args()
+
+    results = {name: measure(cwd, target_args, args.runs) for name, (cwd, target_args) in TARGETS.items()}
+    baseline = results["interpreter"]["median_ms"]
+    for result in results.values():
+        result["over_interpreter_ms"] = round(result["median_ms"] - baseline, 2)
+
+    history = load_history(args.history)
+    previous = history[-1]["results"] if history else {}
+
+    print(f"{'target':<24} {'min':>9} {'median':>9} {'p90':>9} {'-interp':>9} {'vs last':>9}")
+    for name, result in results.items():
+        delta = ""
+        if name in previous:
+            delta = f"{result['median_ms'] - previous[name]['median_ms']:+.1f}"
+        print(f"{name:<24} {result['min_ms']:9.1f} {result['median_ms']:9.1f} {result['p90_ms']:9.1f} "
+              f"{result['over_interpreter_ms']:9.1f} {delta:>9}")
+
+    if args.imports:
+        for name, (cwd, target_args) in TARGETS.items():
+            if name == "interpreter":
+                continue
+            print(f"\nslowest imports, {name}:")
+            for cumulative, module in slowest_imports(cwd, target_args):
+                print(f"  {cumulative / 1000:8.1f} ms  {module}")
+
+    if not args.no_save:
+        history.append({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "runs": args.runs,
+            "results": results
+        })
+        save_history(history, args.history)
+        print(f"\nappended to {args.history} ({len(history)} runs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Micro-benchmark for the JSON decoding layer.
+
+Run from the AdvancedAPIfetch directory:
+
+    python -m benchmarks.bench_decode
+"""
+import json
+import os
+import timeit
+
+import src.decode as decode
+
+PAYLOAD_DIR = os.path.join(os.path.dirname(__file__), "payloads")
+
+
+def load_payload(name):
+    with open(os.path.join(PAYLOAD_DIR, name), mode="rb") as file:
+        return file.read()
+
+
+def stdlib_weather(body):
+    data = json.loads(body)
+    return {"weather": data['weather'][0]['description'], **data['main']}
+
+
+def bench(label, func, body, number):
+    seconds = min(timeit.repeat(lambda: func(body), number=number, repeat=5))
+    print(f"{label:<32} {seconds / number * 1e6:10.2f} us/op")
+
+
+def main():
+    weather = load_payload("weather_delhi.json")
+    stocks = load_payload("stocks_page.json")
+
+    print(f"Decoding backend: {decode.BACKEND}")
+    bench("weather / stdlib json", stdlib_weather, weather, 20000)
+    bench(f"weather / decode ({decode.BACKEND})", decode.decode_weather, weather, 20000)
+    # A large untyped page, like BasicAPIfetch's stocks listing.
+    bench("stocks / stdlib json", json.loads, stocks, 200)
+    bench(f"stocks / loads ({decode.BACKEND})", decode.loads, stocks, 200)
+
+
+if __name__ == "__main__":
+    main()
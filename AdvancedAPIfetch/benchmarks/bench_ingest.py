@@ -0,0 +1,126 @@
+"""Ingest, query and memory benchmark on synthetic data.
+
+Run from the AdvancedAPIfetch directory, e.g.
+
+    python -m benchmarks.bench_ingest --cities 100 --observations 100 1000
+    python -m benchmarks.bench_ingest --prebuilt-db big.db --observations 100000
+
+Each --observations value is one run with --cities x observations rows.
+A run writes a CSV with --malformed-rate bad rows and times
+write_weather_data_to_db over it. It then times the common read queries
+against a database built with the synthetic generator.
+"""
+import argparse
+import contextlib
+import os
+import resource
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import src.deadletter as deadletter
+import src.updateDB as updateDB
+from src.readDB import read_latest_weather
+from src.retention import query_weather_range
+from src.synthetic import START_DATE, build_db, write_csv
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def time_query(func, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def bench_ingest(workdir, cities, observations, seed, malformed_rate, trace_memory=False):
+    csv_filename = os.path.join(workdir, f"weather_{observations}.csv")
+    rows = write_csv(csv_filename, cities, observations, seed, malformed_rate)
+
+    updateDB.CSV_FILENAME = csv_filename
+    deadletter.DEAD_LETTER_FILENAME = os.path.join(workdir, "dead_letter.jsonl")
+    conn = sqlite3.connect(os.path.join(workdir, f"ingest_{observations}.db"))
+    updateDB.create_tables(conn)
+
+    # tracemalloc slows the ingest down noticeably, so it is opt-in
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        updateDB.write_weather_data_to_db(conn)
+    elapsed = time.perf_counter() - started
+    traced_peak = 0
+    if trace_memory:
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    stored = conn.execute("SELECT COUNT(*) FROM Weather").fetchone()[0]
+    conn.close()
+    return rows, stored, elapsed, traced_peak / 1024 / 1024
+
+
+def bench_queries(db_filename):
+    conn = sqlite3.connect(db_filename)
+    day_start = START_DATE.strftime("%Y-%m-%d")
+    day_end = START_DATE.replace(day=2).strftime("%Y-%m-%d")
+    results = {
+        "latest per city": time_query(lambda: read_latest_weather(conn)),
+        "range, 1 day": time_query(lambda: query_weather_range(conn, day_start, day_end)),
+        "range, 1 day, 1 city": time_query(
+            lambda: query_weather_range(conn, day_start, day_end, city="Bengaluru")),
+        "group by latest (no index)": time_query(lambda: conn.execute("""
+            SELECT city_id, MAX(date) FROM Weather GROUP BY city_id
+            """).fetchall(), repeat=3),
+    }
+    conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic ingest/query benchmark")
+    parser.add_argument("--cities", type=int, default=100)
+    parser.add_argument("--observations", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--malformed-rate", type=float, default=0.01)
+    parser.add_argument("--prebuilt-db", help="reuse (or create once) this database for the query runs")
+    parser.add_argument("--skip-ingest", action="store_true")
+    parser.add_argument("--trace-memory", action="store_true", help="report the Python heap peak of the ingest")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="weather-bench-")
+    try:
+        for observations in args.observations:
+            total = args.cities * observations
+            print(f"== {args.cities} cities x {observations} observations = {total:,} rows")
+
+            if not args.skip_ingest:
+                rows, stored, elapsed, traced_mb = bench_ingest(
+                    workdir, args.cities, observations, args.seed, args.malformed_rate, args.trace_memory)
+                print(f"ingest: {stored:,}/{rows:,} rows stored in {elapsed:.2f}s "
+                      f"({stored / elapsed:,.0f} rows/s)"
+                      + (f", traced peak {traced_mb:.1f} MB" if args.trace_memory else ""))
+
+            db_filename = args.prebuilt_db or os.path.join(workdir, f"query_{observations}.db")
+            if not os.path.exists(db_filename):
+                started = time.perf_counter()
+                build_db(db_filename, args.cities, observations, args.seed)
+                print(f"built {db_filename} in {time.perf_counter() - started:.2f}s")
+
+            for name, millis in bench_queries(db_filename).items():
+                print(f"query {name:<28} {millis:10.3f} ms")
+            print(f"peak RSS so far: {peak_rss_mb():.1f} MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
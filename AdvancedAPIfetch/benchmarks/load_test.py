@@ -0,0 +1,99 @@
+"""Load test for the weather query service.
+
+Start the service (python -m src.service), then from the AdvancedAPIfetch
+directory:
+
+    python -m benchmarks.load_test --url http://127.0.0.1:8080 \
+        --path /latest --path "/aggregate?start=2025-01-01&end=2026-01-01" \
+        --concurrency 8 --duration 10
+"""
+import argparse
+import http.client
+import threading
+import time
+from urllib.parse import urlparse
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def worker(host, port, paths, deadline, gzip, latencies, errors, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Accept-Encoding": "gzip"} if gzip else {}
+    local_latencies = []
+    local_errors = 0
+    n = 0
+
+    while time.perf_counter() < deadline:
+        path = paths[n % len(paths)]
+        n += 1
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                local_errors += 1
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+        local_latencies.append(time.perf_counter() - start)
+
+    conn.close()
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+
+def run(url, paths, concurrency, duration, gzip=True):
+    parsed = urlparse(url)
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    threads = [
+        threading.Thread(target=worker,
+                         args=(parsed.hostname, parsed.port or 80, paths, deadline, gzip, latencies, errors, lock))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the weather query service")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--path", action="append", dest="paths")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--no-gzip", action="store_true")
+    args = parser.parse_args()
+
+    result = run(args.url, args.paths or ["/latest"], args.concurrency, args.duration, not args.no_gzip)
+    print(f"Requests:     {result['requests']} ({result['errors']} errors)")
+    print(f"Throughput:   {result['rps']:.1f} req/s")
+    print(f"Latency p50:  {result['p50_ms']:.2f} ms")
+    print(f"Latency p99:  {result['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from Exceptions.my_exceptions import CircuitOpenError
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Fail fast while the upstream API is down.
+
+    The breaker opens after `failure_threshold` consecutive failures and
+    rejects calls with CircuitOpenError for `reset_timeout` seconds. After
+    that a single trial call is let through (half-open): success closes the
+    breaker, failure opens it again.
+
+    With `state_file`, the state is read and written through a JSON file
+    under an advisory lock, so parallel workers trip and recover together.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, state_file=None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state_file = state_file
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if not self.state_file:
+                yield
+                return
+
+            lock_file = open(f"{self.state_file}.lock", mode="a")
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._load()
+                yield
+                self._save()
+            finally:
+                lock_file.close()
+
+    def _load(self):
+        try:
+            with open(self.state_file, mode="r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        self.state = data.get("state", CLOSED)
+        self.failures = data.get("failures", 0)
+        self.opened_at = data.get("opened_at")
+        self.probe_started_at = data.get("probe_started_at")
+
+    def _save(self):
+        tmp_filename = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(tmp_filename, mode="w", encoding="utf-8") as file:
+            json.dump({
+                "state": self.state,
+                "failures": self.failures,
+                "opened_at": self.opened_at,
+                "probe_started_at": self.probe_started_at
+            }, file)
+        os.replace(tmp_filename, self.state_file)
+
+    def before_call(self):
+        with self._locked():
+            now = time.time()
+
+            if self.state == OPEN:
+                remaining = self.opened_at + self.reset_timeout - now
+                if remaining > 0:
+                    raise CircuitOpenError(f"Circuit open, retry in {remaining:.0f}s")
+                self.state = HALF_OPEN
+                self.probe_started_at = now
+
+            elif self.state == HALF_OPEN:
+                # Only one trial call at a time; a stuck trial is abandoned
+                # after another reset_timeout.
+                if self.probe_started_at and now - self.probe_started_at < self.reset_timeout:
+                    raise CircuitOpenError("Circuit half-open, trial call in progress")
+                self.probe_started_at = now
+
+    def record_success(self):
+        with self._locked():
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.probe_started_at = None
+
+    def record_failure(self):
+        with self._locked():
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.time()
+                self.probe_started_at = None
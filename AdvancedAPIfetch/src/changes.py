@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+
+STATE_FILENAME = "weather_state.json"
+
+
+def fingerprint(observation):
+    """Stable hash of an observation's values, independent of key order."""
+    body = json.dumps(observation, sort_keys=True, default=str)
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+
+class ObservationTracker:
+    """Remembers the last observation seen per city.
+
+    Each city keeps the upstream `dt` timestamp, a fingerprint of the
+    returned values and any ETag/Last-Modified validators, so repeated
+    polls of an unchanged observation can be skipped. State is kept in
+    memory and written to `filename` (when given) by save().
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.state = {}
+
+        if filename and os.path.exists(filename):
+            try:
+                with open(filename, mode="r", encoding="utf-8") as file:
+                    self.state = json.load(file)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable tracker state {filename}: {e}")
+                self.state = {}
+
+    def conditional_headers(self, city):
+        entry = self.state.get(city, {})
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def is_unchanged(self, city, dt=None, observation=None):
+        entry = self.state.get(city)
+        if not entry:
+            return False
+        if dt is not None:
+            return entry.get("dt") == dt
+        if observation is not None:
+            return entry.get("hash") == fingerprint(observation)
+        return False
+
+    def record(self, city, dt=None, observation=None, headers=None):
+        entry = self.state.setdefault(city, {})
+        if dt is not None:
+            entry["dt"] = dt
+        if observation is not None:
+            entry["hash"] = fingerprint(observation)
+        if headers:
+            if headers.get("ETag"):
+                entry["etag"] = headers["ETag"]
+            if headers.get("Last-Modified"):
+                entry["last_modified"] = headers["Last-Modified"]
+
+    def save(self):
+        if not self.filename:
+            return
+        tmp_filename = f"{self.filename}.tmp"
+        with open(tmp_filename, mode="w", encoding="utf-8") as file:
+            json.dump(self.state, file)
+        os.replace(tmp_filename, self.filename)
@@ -0,0 +1,65 @@
+"""Single entry point for the weather tools.
+
+Run from the AdvancedAPIfetch directory:
+
+    python -m src.cli fetch --city Delhi
+    python -m src.cli ingest
+    python -m src.cli serve --port 8080
+
+Each command's module is imported only when that command runs, so
+`--help` and the light commands start without loading requests or the
+HTTP server.
+"""
+import argparse
+import importlib
+import sys
+
+# command -> (module, function, help). Commands marked as passing their
+# arguments through parse them in the target's own main().
+COMMANDS = {
+    "fetch": ("src.main", "main", "fetch one city and append it to the CSV"),
+    "ingest": ("src.updateDB", "update_db_from_csv", "load the CSV into SQLite"),
+    "read": ("src.readDB", "read_all_data_from_db", "print the database contents"),
+    "archive": ("src.retention", "archive_weather_data", "move old rows into monthly archives"),
+    "replay": ("src.replay", "main", "retry dead-lettered rows and fetches"),
+    "pipeline": ("src.pipeline", "main", "run the bounded fetch/CSV/DB pipeline"),
+    "serve": ("src.service", "main", "serve the store over HTTP"),
+    "synth": ("src.synthetic", "main", "generate synthetic CSVs and databases"),
+}
+PASS_THROUGH = {"replay", "pipeline", "serve", "synth"}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Weather fetch and storage tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, (_, _, help_text) in COMMANDS.items():
+        command = commands.add_parser(name, help=help_text, add_help=name not in PASS_THROUGH)
+        if name == "fetch":
+            command.add_argument("--city", default="Bengaluru")
+        elif name == "archive":
+            command.add_argument("max_age_days", type=int, nargs="?")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+
+    module_name, function_name, _ = COMMANDS[args.command]
+    if rest and args.command not in PASS_THROUGH:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    function = getattr(importlib.import_module(module_name), function_name)
+
+    if args.command in PASS_THROUGH:
+        sys.argv = [f"{parser.prog} {args.command}", *rest]
+        return function()
+    if args.command == "fetch":
+        return function(city=args.city)
+    if args.command == "archive" and args.max_age_days is not None:
+        return function(args.max_age_days)
+    return function()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import csv
+import gzip
+import io
+import os
+import shutil
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Column order of weather.csv: city and description, then OpenWeatherMap's
+# "main" block in the order fetch_weather receives it.
+CSV_FIELDS = ["city", "weather", "temp", "feels_like", "temp_min", "temp_max",
+              "pressure", "humidity", "sea_level", "grnd_level"]
+
+GZIP_EXTENSIONS = (".gz", ".gzip")
+ZSTD_EXTENSIONS = (".zst", ".zstd")
+
+# Appends to a compressed CSV collect in a plain-text tail file until it
+# holds this many bytes, then go into the compressed file as one segment.
+# A row or two per segment would compress worse than plain text.
+SEGMENT_BYTES = 64 * 1024
+
+
+def codec_for(filename):
+    name = filename.lower()
+    if name.endswith(GZIP_EXTENSIONS):
+        return "gzip"
+    if name.endswith(ZSTD_EXTENSIONS):
+        return "zstd"
+    return None
+
+
+def tail_filename(filename):
+    return f"{filename}.tail"
+
+
+def open_csv(filename, mode="r"):
+    """Open a CSV file as text for reading ("r"), writing ("w") or appending ("a").
+
+    The codec is picked from the extension: .gz for gzip, .zst for zstd,
+    anything else is plain text. Writing compresses as a stream. Appends to
+    a compressed file go to its plain tail file, which is compressed into a
+    new gzip member or zstd frame once it reaches SEGMENT_BYTES, so nothing
+    already written is rewritten. Reads decompress the segments as a
+    stream, followed by the tail.
+    """
+    codec = codec_for(filename)
+
+    if codec is None:
+        return open(filename, mode=mode, encoding="utf-8", newline="")
+
+    if codec == "zstd" and zstandard is None:
+        raise ImportError(f"zstandard is required to open {filename}")
+
+    tail = tail_filename(filename)
+    if mode == "a":
+        if not os.path.exists(filename):
+            open(filename, mode="wb").close()
+        return _SegmentAppender(filename, open(tail, mode="a", encoding="utf-8", newline=""))
+
+    if mode == "w":
+        if os.path.exists(tail):
+            os.remove(tail)
+        return _open_compressed(filename, codec, "w")
+
+    segments = _open_compressed(filename, codec, "r")
+    try:
+        tail_file = open(tail, mode="r", encoding="utf-8", newline="")
+    except FileNotFoundError:
+        return segments
+    return _ChainedReader(segments, tail_file)
+
+
+def _open_compressed(filename, codec, mode):
+    if codec == "gzip":
+        return gzip.open(filename, mode=mode + "t", encoding="utf-8", newline="")
+    if mode == "r":
+        stream = zstandard.ZstdDecompressor().stream_reader(
+            open(filename, mode="rb"), read_across_frames=True
+        )
+    else:
+        stream = zstandard.ZstdCompressor().stream_writer(open(filename, mode=mode + "b"))
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+
+def compact(filename):
+    """Compress the tail of a compressed CSV into one new segment now, e.g.
+    before the file is uploaded or rotated."""
+    tail = tail_filename(filename)
+    if not os.path.exists(tail):
+        return
+    if os.path.getsize(tail):
+        with open(tail, mode="r", encoding="utf-8", newline="") as source, \
+                _open_compressed(filename, codec_for(filename), "a") as segment:
+            shutil.copyfileobj(source, segment)
+    os.remove(tail)
+
+
+class _SegmentAppender:
+    """Text file appending to a compressed CSV's tail; compacts on close
+    once the tail is large enough."""
+
+    def __init__(self, filename, tail_file):
+        self.filename = filename
+        self.tail_file = tail_file
+
+    def write(self, text):
+        return self.tail_file.write(text)
+
+    def close(self):
+        self.tail_file.close()
+        if os.path.getsize(self.tail_file.name) >= SEGMENT_BYTES:
+            compact(self.filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _ChainedReader:
+    """The compressed segments, then the tail, read as one text file."""
+
+    def __init__(self, *files):
+        self.files = files
+
+    def __iter__(self):
+        for file in self.files:
+            yield from file
+
+    def read(self):
+        return "".join(file.read() for file in self.files)
+
+    def close(self):
+        for file in self.files:
+            file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_header(filename):
+    """The header row of an existing CSV, or None if it is missing or empty."""
+    try:
+        with open_csv(filename, mode="r") as file:
+            return next(csv.reader(file), None)
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,105 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from Exceptions.my_exceptions import ReaderTimeoutError
+
+
+class ConnectionManager:
+    """Shared SQLite connections for one database file.
+
+    Readers check a connection out of a pool of at most `max_readers`
+    connections and return it when done; a reader waits while all of them
+    are in use, so many short-lived threads (one per HTTP client, say)
+    share a fixed number of connections. With `reader_timeout` (seconds),
+    it waits at most that long and then raises ReaderTimeoutError. All
+    writes go through a single dedicated writer connection, serialised by
+    a lock, so concurrent writers queue up instead of failing with
+    "database is locked". Every connection runs in WAL mode with the
+    pragmas below and keeps a prepared statement cache.
+    """
+
+    def __init__(self, filename, busy_timeout=5000, mmap_size=268435456,
+                 cache_size=-20000, cached_statements=256, max_readers=8, reader_timeout=None):
+        self.filename = filename
+        self.busy_timeout = busy_timeout
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.cached_statements = cached_statements
+        self._idle_readers = queue.LifoQueue()
+        self._reader_slots = threading.BoundedSemaphore(max_readers)
+        self.reader_timeout = reader_timeout
+        self._writer = None
+        self._writer_lock = threading.RLock()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+    def _connect(self, read_only=False):
+        conn = sqlite3.connect(
+            self.filename,
+            timeout=self.busy_timeout / 1000,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        cursor = conn.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={int(self.busy_timeout)}")
+        cursor.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(self.cache_size)}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        else:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def reader(self):
+        if not self._reader_slots.acquire(timeout=self.reader_timeout):
+            raise ReaderTimeoutError(f"No reader connection free after {self.reader_timeout}s")
+        try:
+            try:
+                conn = self._idle_readers.get_nowait()
+            except queue.Empty:
+                conn = self._connect(read_only=True)
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle_readers.put(conn)
+        finally:
+            self._reader_slots.release()
+
+    @contextmanager
+    def writer(self):
+        """Yield the writer connection; commit on success, roll back on error."""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            try:
+                yield self._writer
+                self._writer.commit()
+            except Exception:
+                self._writer.rollback()
+                raise
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Database error while closing connection: {e}")
+        self._writer = None
+        self._idle_readers = queue.LifoQueue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,72 @@
+import json
+import os
+from datetime import datetime
+
+DEAD_LETTER_FILENAME = os.getenv("WEATHER_DEAD_LETTER", "dead_letter.jsonl")
+
+ROW = "row"
+FETCH = "fetch"
+
+
+def record_failure(kind, payload, error, filename=None):
+    """Append a failed CSV row or fetch request to the dead-letter file.
+
+    `kind` is ROW (payload is the raw CSV row) or FETCH (payload holds the
+    fetch_weather arguments). Recording never raises: a broken dead-letter
+    file must not take the pipeline down with it.
+    """
+    entry = {
+        "kind": kind,
+        "payload": payload,
+        "error_class": type(error).__name__,
+        "error": str(error),
+        "time": datetime.utcnow().isoformat(timespec="seconds"),
+        "attempts": 0
+    }
+    try:
+        with open(filename or DEAD_LETTER_FILENAME, mode="a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Could not record dead letter: {e}")
+
+
+def is_transient(error):
+    """Whether a failed fetch may succeed later: a timeout, a network
+    error, a 5xx response or an open circuit. A ClientError (bad key,
+    unknown city) or a local error fails the same way on every retry."""
+    import requests
+    from Exceptions.my_exceptions import CircuitOpenError, ServerError
+
+    if isinstance(error, (requests.exceptions.RequestException, ServerError, CircuitOpenError)):
+        return True
+    # fetch_weather reports exhausted network retries as a plain Exception
+    # raised while handling the RequestException.
+    return isinstance(error.__context__, requests.exceptions.RequestException)
+
+
+def read_entries(filename=None):
+    filename = filename or DEAD_LETTER_FILENAME
+    if not os.path.exists(filename):
+        return []
+
+    entries = []
+    with open(filename, mode="r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError as e:
+                print(f"Skipping unreadable dead letter: {e}")
+    return entries
+
+
+def write_entries(entries, filename=None):
+    """Replace the dead-letter file with `entries` (used after a replay)."""
+    filename = filename or DEAD_LETTER_FILENAME
+    tmp_filename = f"{filename}.tmp"
+    with open(tmp_filename, mode="w", encoding="utf-8") as file:
+        for entry in entries:
+            file.write(json.dumps(entry) + "\n")
+    os.replace(tmp_filename, filename)
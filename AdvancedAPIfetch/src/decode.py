@@ -0,0 +1,97 @@
+import json
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Optional faster JSON backends. msgspec decodes straight into the structs
+# below and skips every field we don't declare; orjson is a faster drop-in
+# for json.loads. The stdlib is always available as the last resort.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# What each backend raises for a body that isn't valid JSON (or, with
+# msgspec, doesn't fit the struct). orjson's error is a ValueError.
+DECODE_ERRORS = (ValueError,)
+if msgspec is not None:
+    DECODE_ERRORS += (msgspec.DecodeError,)
+
+if msgspec is not None:
+    BACKEND = "msgspec"
+elif orjson is not None:
+    BACKEND = "orjson"
+else:
+    BACKEND = "json"
+
+
+@dataclass
+class WeatherCondition:
+    description: str = ""
+
+
+@dataclass
+class WeatherPayload:
+    main: Optional[dict] = None
+    weather: list[WeatherCondition] = field(default_factory=list)
+    dt: Optional[int] = None
+    message: Optional[str] = None
+
+    @property
+    def description(self):
+        return self.weather[0].description
+
+
+def loads(body):
+    if BACKEND == "msgspec":
+        return msgspec.json.decode(body)
+    if BACKEND == "orjson":
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _weather_from_dict(data):
+    return WeatherPayload(
+        main=data.get("main"),
+        weather=[WeatherCondition(description=w.get("description", ""))
+                 for w in data.get("weather", [])],
+        dt=data.get("dt"),
+        message=data.get("message")
+    )
+
+
+def decode_weather(body):
+    if BACKEND == "msgspec":
+        return msgspec.json.decode(body, type=WeatherPayload)
+    return _weather_from_dict(loads(body))
+
+
+def _raw_body(response):
+    body = getattr(response, "content", None)
+    if isinstance(body, (bytes, bytearray, memoryview, str)):
+        return body
+    return None
+
+
+def decode_weather_response(response):
+    """Decode an OpenWeatherMap response into a WeatherPayload.
+
+    Uses the raw body with the fastest available backend, and falls back
+    to response.json() for responses that don't expose raw bytes.
+    """
+    body = _raw_body(response)
+    if body is None:
+        return _weather_from_dict(response.json())
+    try:
+        return decode_weather(body)
+    except DECODE_ERRORS as e:
+        # Raise what response.json() raises, a RequestException, so a
+        # non-JSON body (an HTML 502 page during an outage, say) is retried
+        # like a network error.
+        import requests
+        raise requests.exceptions.JSONDecodeError(
+            getattr(e, "msg", str(e)), getattr(e, "doc", ""), getattr(e, "pos", 0)) from e
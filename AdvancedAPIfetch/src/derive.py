@@ -0,0 +1,144 @@
+import math
+
+# numpy is optional; without it the batch maths runs as plain Python.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+KELVIN = 273.15
+
+# Unit conversions are VIRTUAL generated columns: computed by SQLite on
+# read, never stored, and usable in WHERE/ORDER BY like any column.
+# Needs SQLite 3.31+.
+GENERATED_COLUMNS = tuple(
+    (f"{column}_{unit}", expression.format(column=column))
+    for column in ("temp", "temp_min", "temp_max")
+    for unit, expression in (
+        ("c", "ROUND({column} - 273.15, 2)"),
+        ("f", "ROUND(({column} - 273.15) * 1.8 + 32, 2)")
+    )
+)
+
+# Humidity-dependent metrics are computed at ingest and stored.
+STORED_COLUMNS = ("dew_point_c", "heat_index_c")
+
+DERIVED_COLUMNS = ("temp_c", "temp_f", "dew_point_c", "heat_index_c")
+
+# Magnus formula coefficients
+MAGNUS_A = 17.62
+MAGNUS_B = 243.12
+
+
+def _dew_point(temp_c, humidity):
+    if humidity is None or humidity <= 0:
+        return None
+    gamma = math.log(humidity / 100) + MAGNUS_A * temp_c / (MAGNUS_B + temp_c)
+    return MAGNUS_B * gamma / (MAGNUS_A - gamma)
+
+
+def _heat_index(temp_f, humidity):
+    """NWS heat index in Fahrenheit: Steadman's formula, replaced by the
+    Rothfusz regression (with its adjustments) from 80F up."""
+    heat_index = 0.5 * (temp_f + 61.0 + (temp_f - 68.0) * 1.2 + humidity * 0.094)
+    if (heat_index + temp_f) / 2 < 80:
+        return heat_index
+
+    heat_index = (-42.379 + 2.04901523 * temp_f + 10.14333127 * humidity
+                  - 0.22475541 * temp_f * humidity - 0.00683783 * temp_f * temp_f
+                  - 0.05481717 * humidity * humidity + 0.00122874 * temp_f * temp_f * humidity
+                  + 0.00085282 * temp_f * humidity * humidity
+                  - 0.00000199 * temp_f * temp_f * humidity * humidity)
+    if humidity < 13 and 80 <= temp_f <= 112:
+        heat_index -= (13 - humidity) / 4 * math.sqrt((17 - abs(temp_f - 95)) / 17)
+    elif humidity > 85 and 80 <= temp_f <= 87:
+        heat_index += (humidity - 85) / 10 * (87 - temp_f) / 5
+    return heat_index
+
+
+def _derive_python(temps, humidities):
+    derived = []
+    for temp, humidity in zip(temps, humidities):
+        if temp is None or humidity is None:
+            derived.append((None, None))
+            continue
+        temp_c = temp - KELVIN
+        dew_point = _dew_point(temp_c, humidity)
+        heat_index = (_heat_index(temp_c * 1.8 + 32, humidity) - 32) / 1.8
+        derived.append((None if dew_point is None else round(dew_point, 2), round(heat_index, 2)))
+    return derived
+
+
+def _derive_numpy(temps, humidities):
+    temp_c = np.array([np.nan if t is None else t for t in temps], dtype=float) - KELVIN
+    humidity = np.array([np.nan if h is None else h for h in humidities], dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = np.log(humidity / 100) + MAGNUS_A * temp_c / (MAGNUS_B + temp_c)
+        dew_point = np.where(humidity > 0, MAGNUS_B * gamma / (MAGNUS_A - gamma), np.nan)
+
+        temp_f = temp_c * 1.8 + 32
+        simple = 0.5 * (temp_f + 61.0 + (temp_f - 68.0) * 1.2 + humidity * 0.094)
+        regression = (-42.379 + 2.04901523 * temp_f + 10.14333127 * humidity
+                      - 0.22475541 * temp_f * humidity - 0.00683783 * temp_f * temp_f
+                      - 0.05481717 * humidity * humidity + 0.00122874 * temp_f * temp_f * humidity
+                      + 0.00085282 * temp_f * humidity * humidity
+                      - 0.00000199 * temp_f * temp_f * humidity * humidity)
+        dry = (humidity < 13) & (temp_f >= 80) & (temp_f <= 112)
+        regression -= np.where(dry, (13 - humidity) / 4 * np.sqrt(np.abs(17 - np.abs(temp_f - 95)) / 17), 0)
+        humid = (humidity > 85) & (temp_f >= 80) & (temp_f <= 87)
+        regression += np.where(humid, (humidity - 85) / 10 * (87 - temp_f) / 5, 0)
+        heat_index = (np.where((simple + temp_f) / 2 < 80, simple, regression) - 32) / 1.8
+
+    return [
+        (None if math.isnan(dew) else dew, None if math.isnan(heat) else heat)
+        for dew, heat in zip(np.round(dew_point, 2).tolist(), np.round(heat_index, 2).tolist())
+    ]
+
+
+def derive_batch(temps, humidities):
+    """(dew_point_c, heat_index_c) for each temperature (Kelvin) and
+    relative humidity (%) pair; None where it can't be computed."""
+    if np is not None:
+        return _derive_numpy(temps, humidities)
+    return _derive_python(temps, humidities)
+
+
+def table_columns(cursor, table, schema="main"):
+    # table_xinfo, unlike table_info, lists generated columns too.
+    cursor.execute(f"PRAGMA {schema}.table_xinfo({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def add_derived_columns(cursor, table, schema="main", batch_size=10000):
+    """Add any missing derived columns to `table`, backfilling the stored
+    ones for rows already there. Returns the names of the added columns."""
+    existing = table_columns(cursor, table, schema)
+    added = []
+    for column in STORED_COLUMNS:
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {column} REAL")
+            added.append(column)
+    for column, expression in GENERATED_COLUMNS:
+        if column not in existing:
+            cursor.execute(
+                f"ALTER TABLE {schema}.{table} ADD COLUMN {column} REAL GENERATED ALWAYS AS ({expression}) VIRTUAL")
+            added.append(column)
+
+    if set(STORED_COLUMNS) & set(added):
+        last = 0
+        while True:
+            cursor.execute(f"""
+            SELECT rowid, temp, humidity FROM {schema}.{table}
+            WHERE rowid > ? ORDER BY rowid LIMIT ?
+            """, (last, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            derived = derive_batch([row[1] for row in rows], [row[2] for row in rows])
+            cursor.executemany(
+                f"UPDATE {schema}.{table} SET dew_point_c = ?, heat_index_c = ? WHERE rowid = ?",
+                [(*values, row[0]) for values, row in zip(derived, rows)]
+            )
+            last = rows[-1][0]
+    return added
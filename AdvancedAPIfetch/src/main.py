@@ -1,23 +1,70 @@
-import requests
-import csv
 import os
 import time
-from Exceptions.my_exceptions import ClientError, ServerError, RedirectionError, UnexpectedError
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-api_key = os.getenv("API_KEY")
-
-def fetch_weather(key=api_key, city="Bengaluru", time_out=3, retries=3, delay=2):
+from Exceptions.my_exceptions import ClientError, ServerError, RedirectionError, UnexpectedError, CircuitOpenError
+
+BREAKER_FILENAME = "weather_breaker.json"
+
+
+class Config:
+    """Settings from the environment, with .env loaded on first use rather
+    than when this module is imported."""
+
+    def __init__(self):
+        from dotenv import load_dotenv
+        load_dotenv()
+        self.api_key = os.getenv("API_KEY")
+        # weather.csv.gz or weather.csv.zst store compressed segments instead.
+        self.csv_filename = os.getenv("WEATHER_CSV", "weather.csv")
+
+
+_config = None
+
+def get_config():
+    global _config
+    if _config is None:
+        _config = Config()
+    return _config
+
+def __getattr__(name):
+    # Older callers read these as module constants.
+    if name == "api_key":
+        return get_config().api_key
+    if name == "CSV_FILENAME":
+        return get_config().csv_filename
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def record_response(breaker, response):
+    if breaker is None:
+        return
+    if 500 <= response.status_code < 600:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+def fetch_weather(key=None, city="Bengaluru", time_out=3, retries=3, delay=2, tracker=None, breaker=None):
+    # With a tracker, returns None when the observation hasn't changed
+    # since the last poll (304 Not Modified or the same `dt`).
+    # With a breaker, server errors, timeouts and network errors count as
+    # upstream failures, and CircuitOpenError is raised while it is open.
+    # requests and the decoders (orjson, dataclasses) are imported here so
+    # importing this module stays cheap.
+    import requests
+    from src.decode import decode_weather_response
+
+    if key is None:
+        key = get_config().api_key
     url = "https://api.openweathermap.org/data/2.5/weather/"
     headers = {"Content-Type": "application/json"}
+    if tracker is not None:
+        headers.update(tracker.conditional_headers(city))
     payload = {
         "q": city,
         "appid": f"{key}"
     }
 
     for attempt in range(1, retries + 1):
+        if breaker is not None:
+            breaker.before_call()
         try:
             response = requests.post(
                 url,
@@ -26,17 +73,34 @@ def fetch_weather(key=api_key, city="Bengaluru", time_out=3, retries=3, delay=2)
                 timeout=time_out
             )
 
+            if tracker is not None and response.status_code == 304:
+                if breaker is not None:
+                    breaker.record_success()
+                print("304 not modified")
+                return None
+
             if "charset=utf-8" not in response.headers.get("Content-Type", ""):
+                record_response(breaker, response)
                 raise Exception("Invalid encoding format")
 
             status = response.status_code
-            data = response.json()
+            # Recorded once the body has decoded: a body that isn't JSON
+            # raises a RequestException, recorded as one failure below.
+            data = decode_weather_response(response)
+            record_response(breaker, response)
+            message = data.message or 'No message'
             # print(data)
             if 200 <= status < 300:
-                if "main" in data:
-                    weather = data['main']
+                if data.main is not None:
+                    weather = data.main
                     print(f"{status} success")
-                    return {"city": f"{city}", "weather": f"{data['weather'][0]['description']}", **weather}
+                    observation = {"city": f"{city}", "weather": f"{data.description}", **weather}
+                    if tracker is not None:
+                        unchanged = tracker.is_unchanged(city, data.dt, observation)
+                        tracker.record(city, data.dt, observation, response.headers)
+                        if unchanged:
+                            return None
+                    return observation
                 else:
                     print(f"Weather data missing 'main' key, attempt {attempt}/{retries}")
                     if attempt == retries:
@@ -46,59 +110,87 @@ def fetch_weather(key=api_key, city="Bengaluru", time_out=3, retries=3, delay=2)
             elif 300 <= status < 400:
                 print(f"{status} Redirection Error, attempt {attempt}/{retries}")
                 if attempt == retries:
-                    raise RedirectionError(f"{status} {data.get('message', 'No message')}")
+                    raise RedirectionError(f"{status} {message}")
                 time.sleep(delay)
 
             elif 400 <= status < 500:
-                raise ClientError(f"{status} {data.get('message', 'No message')}")
+                raise ClientError(f"{status} {message}")
 
             elif 500 <= status < 600:
                 print(f"{status} Server Error, attempt {attempt}/{retries}")
                 if attempt == retries:
-                    raise ServerError(f"{status} {data.get('message', 'No message')}")
+                    raise ServerError(f"{status} {message}")
                 time.sleep(delay)
 
             else:
                 print(f"{status} Unexpected Error, attempt {attempt}/{retries}")
                 if attempt == retries:
-                    raise UnexpectedError(f"{status} {data.get('message', 'No message')}")
+                    raise UnexpectedError(f"{status} {message}")
                 time.sleep(delay)
 
         except requests.exceptions.Timeout:
             print(f"Timeout occurred, attempt {attempt}/{retries}")
+            if breaker is not None:
+                breaker.record_failure()
             if attempt == retries:
                 raise
             time.sleep(delay)
 
         except requests.exceptions.RequestException:
             print(f"Network error: attempt {attempt}/{retries}")
+            if breaker is not None:
+                breaker.record_failure()
             if attempt == retries:
                 raise Exception(f'Network error: after maximum retries: {retries}')
             time.sleep(delay)
     
-def main():
+def append_to_csv(weather_data, filename=None):
+    import csv
+    from src.csvio import open_csv
+
+    filename = filename or get_config().csv_filename
+    file_exists = os.path.exists(filename)
+    with open_csv(filename, mode="a" if file_exists else "w") as file:
+        writer = csv.DictWriter(file, fieldnames=weather_data.keys())
+        
+        if not file_exists:
+            writer.writeheader()
+        writer.writerow(weather_data)
+
+def main(city="Bengaluru"):
+    import requests
+    from src.breaker import CircuitBreaker
+    from src.changes import ObservationTracker, STATE_FILENAME
+    from src.deadletter import record_failure, is_transient, FETCH
+
     try:
-        weather_data = fetch_weather(key=api_key, city="Bengaluru", time_out=3)
+        tracker = ObservationTracker(STATE_FILENAME)
+        breaker = CircuitBreaker(state_file=BREAKER_FILENAME)
+        weather_data = fetch_weather(city=city, time_out=3, tracker=tracker, breaker=breaker)
+
+        if weather_data is None:
+            print(f"No new observation for {city}, skipping CSV append")
+            tracker.save()
+            return
 
         # print(type(weather_data))
         # print(weather_data)
 
-        filename = "weather.csv"
-        file_exists = os.path.exists(filename)
-        with open(filename, 
-                    mode="a" if file_exists else "w",
-                    encoding="utf-8",
-                    newline="") as file:
-            writer = csv.DictWriter(file, fieldnames=weather_data.keys())
-            
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(weather_data)
-
-    except requests.exceptions.Timeout:
+        append_to_csv(weather_data)
+
+        tracker.save()
+
+    except requests.exceptions.Timeout as e:
         print("API call timed out")
+        record_failure(FETCH, {"city": city}, e)
+    except CircuitOpenError as e:
+        print(f"Weather API unavailable, skipped: {e}")
+        record_failure(FETCH, {"city": city}, e)
     except Exception as e:
         print(str(e))
+        # Client errors and local failures would fail again on replay.
+        if is_transient(e):
+            record_failure(FETCH, {"city": city}, e)
         
 
 if __name__=="__main__":
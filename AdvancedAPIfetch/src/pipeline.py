@@ -0,0 +1,262 @@
+import argparse
+import csv
+import os
+import queue
+import resource
+import sqlite3
+import sys
+import threading
+import time
+
+from src.breaker import CircuitBreaker
+from src.changes import ObservationTracker, STATE_FILENAME
+from src.csvio import CSV_FIELDS, open_csv, read_header
+from src.db import ConnectionManager
+from src.deadletter import FETCH, ROW, is_transient, record_failure
+from src.main import BREAKER_FILENAME, fetch_weather, get_config
+from src.updateDB import DB_FILENAME, create_tables, insert_city, insert_weather_batch, parse_weather_row
+
+QUEUE_SIZE = 1000
+BATCH_SIZE = 500
+FETCH_WORKERS = 4
+FLUSH_INTERVAL = 1.0
+
+_DONE = object()
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm", mode="r") as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+class Pipeline:
+    """Bounded fetch -> CSV -> DB pipeline.
+
+    Producers (fetch workers and an optional CSV reader) put rows on a
+    queue of at most `queue_size` entries and block while it is full, so a
+    slow database holds back the producers instead of growing memory. One
+    writer thread appends fetched rows to `out_csv` and commits rows to
+    SQLite in batches of `batch_size`, or every `flush_interval` seconds.
+    Memory therefore stays bounded by queue_size + batch_size rows.
+    """
+
+    def __init__(self, db_filename=DB_FILENAME, out_csv=None, queue_size=QUEUE_SIZE,
+                 batch_size=BATCH_SIZE, fetch_workers=FETCH_WORKERS,
+                 flush_interval=FLUSH_INTERVAL, fetch=None):
+        self.db_filename = db_filename
+        self.out_csv = out_csv
+        self.batch_size = batch_size
+        self.fetch_workers = fetch_workers
+        self.flush_interval = flush_interval
+        self.rows = queue.Queue(maxsize=queue_size)
+        self.stats = {
+            "fetched": 0,
+            "read": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "peak_queue_depth": 0,
+            "producer_wait_seconds": 0.0,
+            "peak_rss_mb": 0.0
+        }
+        self._stats_lock = threading.Lock()
+        self._done_seen = False
+
+        self.tracker = None
+        self.breaker = None
+        self.fetch = fetch
+        if fetch is None:
+            self.tracker = ObservationTracker(STATE_FILENAME)
+            self.breaker = CircuitBreaker(state_file=BREAKER_FILENAME)
+            self.fetch = self.fetch_city
+
+    def fetch_city(self, city):
+        return fetch_weather(city=city, tracker=self.tracker, breaker=self.breaker)
+
+    def count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def put(self, item):
+        started = time.perf_counter()
+        self.rows.put(item)
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self.stats["producer_wait_seconds"] += waited
+            self.stats["peak_queue_depth"] = max(self.stats["peak_queue_depth"], self.rows.qsize())
+
+    def fetch_worker(self, cities):
+        while True:
+            try:
+                city = cities.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                weather_data = self.fetch(city)
+            except Exception as e:
+                print(f"Fetch failed for {city}: {e}")
+                if is_transient(e):
+                    record_failure(FETCH, {"city": city}, e)
+                self.count("failed")
+                continue
+            if weather_data is not None:
+                self.count("fetched")
+                self.put((weather_data, True))
+
+    def csv_reader(self, filename):
+        try:
+            with open_csv(filename, mode="r") as file:
+                for row in csv.DictReader(file):
+                    self.count("read")
+                    self.put((row, False))
+        except OSError as e:
+            print(f"Could not read {filename}: {e}")
+
+    def writer(self):
+        csv_file = None
+        csv_writer = None
+        city_ids = {}
+        batch = []
+        batch_rows = []
+        last_flush = time.monotonic()
+
+        def flush():
+            try:
+                insert_weather_batch(conn, batch)
+                self.count("written", len(batch))
+            except sqlite3.DatabaseError as e:
+                for failed_row in batch_rows:
+                    record_failure(ROW, failed_row, e)
+                self.count("failed", len(batch))
+            self.count("batches")
+            with self._stats_lock:
+                self.stats["peak_rss_mb"] = max(self.stats["peak_rss_mb"], current_rss_mb())
+            batch.clear()
+            batch_rows.clear()
+
+        with ConnectionManager(self.db_filename) as manager, manager.writer() as conn:
+            create_tables(conn)
+            try:
+                while True:
+                    timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+                    try:
+                        item = self.rows.get(timeout=timeout)
+                    except queue.Empty:
+                        item = None
+
+                    if item is _DONE:
+                        self._done_seen = True
+                        break
+
+                    if item is not None:
+                        row, append_to_csv = item
+                        if append_to_csv and self.out_csv:
+                            if csv_writer is None:
+                                # Rows go under the file's own columns, whatever
+                                # keys (and key order) the fetcher returned.
+                                fieldnames = read_header(self.out_csv)
+                                csv_file = open_csv(self.out_csv, mode="a" if fieldnames else "w")
+                                csv_writer = csv.DictWriter(csv_file, fieldnames=fieldnames or CSV_FIELDS,
+                                                            extrasaction="ignore")
+                                if not fieldnames:
+                                    csv_writer.writeheader()
+                            csv_writer.writerow(row)
+                        try:
+                            weather_data = parse_weather_row(row)
+                            if row["city"] not in city_ids:
+                                city_ids[row["city"]] = insert_city(conn, row["city"])
+                            batch.append((city_ids[row["city"]], weather_data))
+                            batch_rows.append(row)
+                        except (KeyError, ValueError, TypeError) as e:
+                            record_failure(ROW, row, e)
+                            self.count("failed")
+
+                    if len(batch) >= self.batch_size or (
+                            batch and time.monotonic() - last_flush >= self.flush_interval):
+                        flush()
+                        last_flush = time.monotonic()
+                    elif not batch:
+                        last_flush = time.monotonic()
+
+                if batch:
+                    flush()
+            finally:
+                if csv_file is not None:
+                    csv_file.close()
+
+    def run(self, cities=(), csv_filename=None):
+        """Fetch `cities` and/or ingest `csv_filename`; returns the stats."""
+        cities = list(cities)
+        work = queue.Queue()
+        for city in cities:
+            work.put(city)
+
+        producers = [
+            threading.Thread(target=self.fetch_worker, args=(work,), daemon=True)
+            for _ in range(min(self.fetch_workers, len(cities)))
+        ]
+        if csv_filename:
+            producers.append(threading.Thread(target=self.csv_reader, args=(csv_filename,), daemon=True))
+
+        errors = []
+
+        def write():
+            try:
+                self.writer()
+            except Exception as e:
+                errors.append(e)
+                # Keep draining so blocked producers can finish.
+                while not self._done_seen:
+                    self._done_seen = self.rows.get() is _DONE
+
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join()
+        self.rows.put(_DONE)
+        writer.join()
+
+        if self.tracker is not None:
+            self.tracker.save()
+        self.stats["peak_rss_mb"] = max(self.stats["peak_rss_mb"], peak_rss_mb())
+        if errors:
+            raise errors[0]
+        return self.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bounded fetch -> CSV -> SQLite pipeline")
+    parser.add_argument("--cities", nargs="*", default=[])
+    parser.add_argument("--csv", help="ingest this CSV file as well")
+    parser.add_argument("--out-csv", default=get_config().csv_filename)
+    parser.add_argument("--db", default=DB_FILENAME)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--fetch-workers", type=int, default=FETCH_WORKERS)
+    args = parser.parse_args()
+
+    try:
+        pipeline = Pipeline(args.db, args.out_csv, args.queue_size, args.batch_size, args.fetch_workers)
+        stats = pipeline.run(args.cities, args.csv)
+        for key, value in stats.items():
+            print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+    except sqlite3.DatabaseError as e:
+        print(f"Database error while running pipeline: {e}")
+    except Exception as e:
+        print(f"Unexpected error while running pipeline: {e}")
+
+
+if __name__ == "__main__":
+    main()
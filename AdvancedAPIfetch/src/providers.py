@@ -0,0 +1,205 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from src.main import fetch_weather
+
+# Shape every provider returns: the weather.csv columns every source can
+# fill, in the CSV's column order (see src.csvio.CSV_FIELDS).
+NORMALIZED_KEYS = ("city", "weather", "temp", "temp_min", "temp_max", "pressure", "humidity")
+
+KELVIN = 273.15
+
+# WMO weather interpretation codes used by Open-Meteo
+WMO_DESCRIPTIONS = {
+    0: "clear sky", 1: "mainly clear", 2: "partly cloudy", 3: "overcast clouds",
+    45: "fog", 48: "depositing rime fog",
+    51: "light drizzle", 53: "drizzle", 55: "dense drizzle",
+    56: "light freezing drizzle", 57: "freezing drizzle",
+    61: "light rain", 63: "moderate rain", 65: "heavy intensity rain",
+    66: "light freezing rain", 67: "freezing rain",
+    71: "light snow", 73: "snow", 75: "heavy snow", 77: "snow grains",
+    80: "light shower rain", 81: "shower rain", 82: "heavy shower rain",
+    85: "light shower snow", 86: "heavy shower snow",
+    95: "thunderstorm", 96: "thunderstorm with hail", 99: "thunderstorm with heavy hail"
+}
+
+
+def normalize(observation):
+    return {key: observation[key] for key in NORMALIZED_KEYS}
+
+
+def is_valid(observation):
+    return isinstance(observation, dict) and all(observation.get(key) is not None for key in NORMALIZED_KEYS)
+
+
+class Provider(ABC):
+    """A weather source returning observations in the NORMALIZED_KEYS shape,
+    with temperatures in Kelvin."""
+
+    name = "provider"
+
+    @abstractmethod
+    def fetch(self, city, time_out=3):
+        """Return one observation for `city`, or raise."""
+
+
+class OpenWeatherMapProvider(Provider):
+    name = "openweathermap"
+
+    def __init__(self, key=None, retries=1, breaker=None):
+        self.key = key
+        self.retries = retries
+        self.breaker = breaker
+
+    def fetch(self, city, time_out=3):
+        return normalize(fetch_weather(key=self.key, city=city, time_out=time_out,
+                                       retries=self.retries, delay=0, breaker=self.breaker))
+
+
+class OpenMeteoProvider(Provider):
+    """Open-Meteo: no API key, city names resolved through its geocoding API."""
+
+    name = "open-meteo"
+    geocoding_url = "https://geocoding-api.open-meteo.com/v1/search"
+    forecast_url = "https://api.open-meteo.com/v1/forecast"
+
+    def __init__(self):
+        self.coordinates = {}
+
+    def locate(self, city, time_out):
+        if city not in self.coordinates:
+            response = requests.get(self.geocoding_url, params={"name": city, "count": 1}, timeout=time_out)
+            response.raise_for_status()
+            results = response.json().get("results")
+            if not results:
+                raise ValueError(f"City not found: {city}")
+            self.coordinates[city] = (results[0]["latitude"], results[0]["longitude"])
+        return self.coordinates[city]
+
+    def fetch(self, city, time_out=3):
+        latitude, longitude = self.locate(city, time_out)
+        response = requests.get(self.forecast_url, params={
+            "latitude": latitude,
+            "longitude": longitude,
+            "current": "temperature_2m,relative_humidity_2m,pressure_msl,weather_code",
+            "daily": "temperature_2m_max,temperature_2m_min",
+            "forecast_days": 1,
+            "timezone": "auto"
+        }, timeout=time_out)
+        response.raise_for_status()
+        data = response.json()
+        current = data["current"]
+        daily = data["daily"]
+        return {
+            "city": city,
+            "weather": WMO_DESCRIPTIONS.get(current["weather_code"], "unknown"),
+            "temp": round(current["temperature_2m"] + KELVIN, 2),
+            "temp_min": round(daily["temperature_2m_min"][0] + KELVIN, 2),
+            "temp_max": round(daily["temperature_2m_max"][0] + KELVIN, 2),
+            "pressure": current["pressure_msl"],
+            "humidity": current["relative_humidity_2m"]
+        }
+
+
+class HedgedFetcher:
+    """Fetch from a primary provider, hedging slow calls.
+
+    The primary is asked first. If it hasn't answered within the
+    `hedge_percentile` latency of its recent successful calls, or it fails,
+    the next provider is asked as well (with a single provider, a
+    duplicate request is sent). The first valid answer wins. Until
+    `min_samples` primary latencies are known, `initial_hedge_delay`
+    seconds is used as the threshold.
+    """
+
+    def __init__(self, providers, hedge_percentile=95, min_samples=20,
+                 initial_hedge_delay=1.0, window=200, max_workers=8):
+        self.providers = list(providers)
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.initial_hedge_delay = initial_hedge_delay
+        self.latencies = deque(maxlen=window)
+        self.stats = {"requests": 0, "hedged": 0, "wins": {}}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def hedge_delay(self):
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return self.initial_hedge_delay
+            ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))
+        return ordered[index]
+
+    def _call(self, provider, city, time_out, primary):
+        started = time.perf_counter()
+        observation = provider.fetch(city, time_out)
+        # Only successful calls count: fast failures (an open circuit, say)
+        # would drag the threshold to zero and hedge every request after
+        # the outage.
+        if primary:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - started)
+        return observation
+
+    def _submit(self, index, city, time_out):
+        provider = self.providers[index % len(self.providers)]
+        future = self._executor.submit(self._call, provider, city, time_out, index == 0)
+        return future, provider
+
+    def fetch(self, city, time_out=3):
+        with self._lock:
+            self.stats["requests"] += 1
+
+        # One primary, then one hedge per provider (or a single duplicate).
+        max_requests = max(2, len(self.providers))
+        pending = {}
+        future, provider = self._submit(0, city, time_out)
+        pending[future] = provider
+        sent = 1
+        first_error = None
+        deadline = time.monotonic() + time_out * max_requests
+
+        while pending:
+            can_hedge = sent < max_requests
+            timeout = self.hedge_delay() if can_hedge else max(0.0, deadline - time.monotonic())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    observation = future.result()
+                except Exception as e:
+                    first_error = first_error or e
+                    continue
+                if is_valid(observation):
+                    with self._lock:
+                        self.stats["wins"][provider.name] = self.stats["wins"].get(provider.name, 0) + 1
+                    return normalize(observation)
+                first_error = first_error or ValueError(f"Invalid observation from {provider.name}")
+
+            if not can_hedge:
+                if not done:
+                    break
+            elif not done:
+                # Slower than the threshold: hedge with the next provider.
+                future, provider = self._submit(sent, city, time_out)
+                pending[future] = provider
+                sent += 1
+                with self._lock:
+                    self.stats["hedged"] += 1
+            elif not pending:
+                # Everything sent so far failed: fail over straight away.
+                future, provider = self._submit(sent, city, time_out)
+                pending[future] = provider
+                sent += 1
+
+        raise first_error or TimeoutError(f"No provider answered for {city}")
+
+    def close(self):
+        self._executor.shutdown(wait=False)
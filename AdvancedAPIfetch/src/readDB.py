@@ -1,46 +1,62 @@
 import sqlite3
+from src.db import ConnectionManager
 
 DB_FILENAME = "weather_data.db"
 
 def read_all_data_from_db():
     try:
-        conn = sqlite3.connect(DB_FILENAME)
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT id, name FROM City")
-        cities = cursor.fetchall()
-        print("Cities in the database:")
-        for city in cities:
-            print(f"ID: {city[0]}, Name: {city[1]}")
+        with ConnectionManager(DB_FILENAME) as manager, manager.reader() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT id, name FROM City")
+            cities = cursor.fetchall()
+            print("Cities in the database:")
+            for city in cities:
+                print(f"ID: {city[0]}, Name: {city[1]}")
         
-        print("\nWeather data in the database:")
-
-        cursor.execute("""
-        SELECT w.id, c.name AS city_name, w.weather, w.temp, w.pressure, w.humidity, 
-               w.temp_min, w.temp_max, w.date
-        FROM Weather w
-        JOIN City c ON w.city_id = c.id
-        """)
-        weather_data = cursor.fetchall()
+            print("\nWeather data in the database:")
+
+            cursor.execute("""
+            SELECT w.id, c.name AS city_name, w.weather, w.temp, w.pressure, w.humidity, 
+                   w.temp_min, w.temp_max, w.date
+            FROM Weather w
+            JOIN City c ON w.city_id = c.id
+            """)
+            weather_data = cursor.fetchall()
         
-        for weather in weather_data:
-            print(f"Weather ID: {weather[0]}")
-            print(f"City: {weather[1]}")
-            print(f"Weather: {weather[2]}")
-            print(f"Temperature: {weather[3]}")
-            print(f"Pressure: {weather[4]}")
-            print(f"Humidity: {weather[5]}")
-            print(f"Min Temp: {weather[6]}")
-            print(f"Max Temp: {weather[7]}")
-            print(f"Date: {weather[8]}")
-            print("-" * 40)
-
-        conn.close()
+            for weather in weather_data:
+                print(f"Weather ID: {weather[0]}")
+                print(f"City: {weather[1]}")
+                print(f"Weather: {weather[2]}")
+                print(f"Temperature: {weather[3]}")
+                print(f"Pressure: {weather[4]}")
+                print(f"Humidity: {weather[5]}")
+                print(f"Min Temp: {weather[6]}")
+                print(f"Max Temp: {weather[7]}")
+                print(f"Date: {weather[8]}")
+                print("-" * 40)
 
     except sqlite3.DatabaseError as e:
         print(f"Database error while reading data: {e}")
     except Exception as e:
         print(f"Unexpected error while reading data: {e}")
 
+def read_latest_weather(conn):
+    """Latest observation for every city, one primary-key row per city.
+
+    Rows are (city_name, weather, temp, pressure, humidity, temp_min,
+    temp_max, date, temp_c, temp_f, dew_point_c, heat_index_c), ordered by
+    city name.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+    SELECT c.name, l.weather, l.temp, l.pressure, l.humidity,
+           l.temp_min, l.temp_max, l.date, l.temp_c, l.temp_f, l.dew_point_c, l.heat_index_c
+    FROM LatestWeather l
+    JOIN City c ON l.city_id = c.id
+    ORDER BY c.name
+    """)
+    return cursor.fetchall()
+
 if __name__ == "__main__":
     read_all_data_from_db()
@@ -0,0 +1,129 @@
+import sqlite3
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from src.breaker import CircuitBreaker
+from src.db import ConnectionManager
+from src.deadletter import FETCH, ROW, is_transient, read_entries, write_entries
+from src.main import BREAKER_FILENAME, append_to_csv, fetch_weather
+from src.updateDB import BATCH_SIZE, DB_FILENAME, create_tables, insert_city, insert_weather_batch, parse_weather_row
+
+MAX_WORKERS = 8
+
+
+def failed_again(entry, error):
+    return {
+        **entry,
+        "error_class": type(error).__name__,
+        "error": str(error),
+        "attempts": entry.get("attempts", 0) + 1
+    }
+
+
+def replay_rows(conn, entries, batch_size=BATCH_SIZE):
+    """Retry dead-lettered CSV rows through the batch insert.
+
+    Returns the entries that failed again.
+    """
+    failed = []
+    city_ids = {}
+    batch = []
+    batch_entries = []
+
+    def flush():
+        try:
+            insert_weather_batch(conn, batch)
+        except sqlite3.DatabaseError as e:
+            failed.extend(failed_again(entry, e) for entry in batch_entries)
+        batch.clear()
+        batch_entries.clear()
+
+    for entry in entries:
+        try:
+            row = entry["payload"]
+            weather_data = parse_weather_row(row)
+            if row["city"] not in city_ids:
+                city_ids[row["city"]] = insert_city(conn, row["city"])
+            batch.append((city_ids[row["city"]], weather_data))
+            batch_entries.append(entry)
+        except Exception as e:
+            failed.append(failed_again(entry, e))
+
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    return failed
+
+
+def replay_fetches(entries, breaker=None, max_workers=MAX_WORKERS):
+    """Re-fetch dead-lettered cities in parallel and append the results to
+    the CSV. Returns the entries that failed again with a transient error;
+    the rest (a ClientError, say) would never succeed and are dropped."""
+    def fetch(entry):
+        try:
+            return entry, fetch_weather(**entry["payload"], retries=1, breaker=breaker), None
+        except Exception as e:
+            return entry, None, e
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for entry, weather_data, error in executor.map(fetch, entries):
+            if error is not None:
+                if is_transient(error):
+                    failed.append(failed_again(entry, error))
+                else:
+                    print(f"Dropping dead-lettered fetch {entry['payload']}: {type(error).__name__}: {error}")
+            elif weather_data is not None:
+                append_to_csv(weather_data)
+    return failed
+
+
+def replay(filename=None, db_filename=DB_FILENAME, max_workers=MAX_WORKERS):
+    entries = read_entries(filename)
+    rows = [entry for entry in entries if entry.get("kind") == ROW]
+    fetches = [entry for entry in entries if entry.get("kind") == FETCH]
+    remaining = [entry for entry in entries if entry.get("kind") not in (ROW, FETCH)]
+
+    if rows:
+        with ConnectionManager(db_filename) as manager, manager.writer() as conn:
+            create_tables(conn)
+            remaining += replay_rows(conn, rows)
+
+    if fetches:
+        breaker = CircuitBreaker(state_file=BREAKER_FILENAME)
+        remaining += replay_fetches(fetches, breaker, max_workers)
+
+    print(f"Replayed {len(entries) - len(remaining)} of {len(entries)} dead letters, "
+          f"{len(remaining)} remaining.")
+
+    # Keep anything recorded while the replay was running.
+    remaining += read_entries(filename)[len(entries):]
+    write_entries(remaining, filename)
+    return remaining
+
+
+def print_summary(filename=None):
+    entries = read_entries(filename)
+    counts = Counter((entry.get("kind"), entry.get("error_class")) for entry in entries)
+    print(f"{len(entries)} dead letters")
+    for (kind, error_class), count in sorted(counts.items()):
+        print(f"{kind:<8} {error_class:<24} {count}")
+
+
+def main():
+    try:
+        if len(sys.argv) > 1 and sys.argv[1] == "--list":
+            print_summary()
+        else:
+            replay()
+    except sqlite3.DatabaseError as e:
+        print(f"Database error while replaying dead letters: {e}")
+    except Exception as e:
+        print(f"Unexpected error while replaying dead letters: {e}")
+
+
+if __name__ == "__main__":
+    main()
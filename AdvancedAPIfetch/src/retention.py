@@ -0,0 +1,220 @@
+import heapq
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+from src.db import ConnectionManager
+from src.derive import DERIVED_COLUMNS, add_derived_columns, table_columns
+
+DB_FILENAME = "weather_data.db"
+ARCHIVE_DIR = "archive"
+MAX_AGE_DAYS = 90
+BATCH_SIZE = 500
+
+WEATHER_COLUMNS = "id, city_id, weather, temp, pressure, humidity, temp_min, temp_max, date, dew_point_c, heat_index_c"
+
+
+def archive_filename(month, archive_dir=ARCHIVE_DIR):
+    return os.path.join(archive_dir, f"weather_{month}.db")
+
+
+def months_between(start, end):
+    """Every YYYY-MM from start to end inclusive; both are date strings."""
+    year, month = int(start[:4]), int(start[5:7])
+    last = (int(end[:4]), int(end[5:7]))
+    months = []
+    while (year, month) <= last:
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def next_month(month):
+    """The YYYY-MM after `month`."""
+    year, month = int(month[:4]), int(month[5:7])
+    return f"{year + 1:04d}-01" if month == 12 else f"{year:04d}-{month + 1:02d}"
+
+
+def create_archive_tables(conn, schema="archive"):
+    cursor = conn.cursor()
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {schema}.City (
+        id INTEGER PRIMARY KEY,
+        name TEXT UNIQUE NOT NULL
+    )
+    """)
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {schema}.Weather (
+        id INTEGER PRIMARY KEY,
+        city_id INTEGER,
+        weather TEXT,
+        temp REAL,
+        pressure REAL,
+        humidity REAL,
+        temp_min REAL,
+        temp_max REAL,
+        date TIMESTAMP
+    )
+    """)
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_weather_date ON Weather(date)")
+    add_derived_columns(cursor, "Weather", schema)
+
+
+def archive_month(conn, month, cutoff, archive_dir=ARCHIVE_DIR, batch_size=BATCH_SIZE):
+    """Move one month's rows older than cutoff into that month's archive.
+
+    Rows are moved in batches of `batch_size`, committing after each, so the
+    write lock is only held for one short transaction at a time. Each batch
+    is picked through idx_weather_date within the month's date range and
+    then moved by id, so a batch costs the same however large the backlog.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    lower = f"{month}-01"
+    upper = min(f"{next_month(month)}-01", cutoff)
+    conn.commit()
+    conn.execute("ATTACH DATABASE ? AS archive", (archive_filename(month, archive_dir),))
+    moved = 0
+    try:
+        create_archive_tables(conn)
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY)")
+        conn.commit()
+
+        cursor = conn.cursor()
+        batch_ids = "SELECT id FROM temp.archive_batch"
+        while True:
+            cursor.execute("DELETE FROM temp.archive_batch")
+            cursor.execute("""
+            INSERT INTO temp.archive_batch (id)
+            SELECT id FROM main.Weather
+            WHERE date >= ? AND date < ?
+            ORDER BY date LIMIT ?
+            """, (lower, upper, batch_size))
+            count = cursor.rowcount
+            if not count:
+                conn.commit()
+                break
+
+            cursor.execute(f"""
+            INSERT OR IGNORE INTO archive.City (id, name)
+            SELECT id, name FROM main.City
+            WHERE id IN (SELECT city_id FROM main.Weather WHERE id IN ({batch_ids}))
+            """)
+            cursor.execute(f"""
+            INSERT OR REPLACE INTO archive.Weather ({WEATHER_COLUMNS})
+            SELECT {WEATHER_COLUMNS} FROM main.Weather WHERE id IN ({batch_ids})
+            """)
+            cursor.execute(f"DELETE FROM main.Weather WHERE id IN ({batch_ids})")
+            conn.commit()
+            moved += count
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("DROP TABLE IF EXISTS temp.archive_batch")
+        conn.execute("DETACH DATABASE archive")
+
+    return moved
+
+
+def archive_old_rows(conn, max_age_days=MAX_AGE_DAYS, archive_dir=ARCHIVE_DIR,
+                     batch_size=BATCH_SIZE, now=None):
+    """Move Weather rows older than max_age_days into per-month archive DBs."""
+    try:
+        now = now or datetime.utcnow()
+        cutoff = (now - timedelta(days=max_age_days)).strftime("%Y-%m-%d %H:%M:%S")
+
+        cursor = conn.cursor()
+        cursor.execute("""
+        SELECT DISTINCT strftime('%Y-%m', date) FROM Weather
+        WHERE date < ? ORDER BY 1
+        """, (cutoff,))
+        months = [row[0] for row in cursor.fetchall() if row[0]]
+
+        moved = 0
+        for month in months:
+            moved += archive_month(conn, month, cutoff, archive_dir, batch_size)
+        return moved
+    except sqlite3.DatabaseError as e:
+        print(f"Database error while archiving data: {e}")
+        raise
+
+
+def query_weather_range(conn, start, end, city=None, archive_dir=ARCHIVE_DIR):
+    """Weather rows with start <= date < end, from the live DB and archives.
+
+    Archives are only attached for the months the range covers. Rows come
+    back as (id, city_name, weather, temp, pressure, humidity, temp_min,
+    temp_max, date, temp_c, temp_f, dew_point_c, heat_index_c) ordered by
+    date.
+    """
+    return list(iter_weather_range(conn, start, end, city, archive_dir))
+
+
+def iter_weather_range(conn, start, end, city=None, archive_dir=ARCHIVE_DIR):
+    """query_weather_range as a generator: rows are read from the cursors
+    as they are consumed, so a large range is never held in memory.
+
+    The range is read a month at a time, merging the live table's rows for
+    that month with the month's archive, both read ordered by date. An
+    archive can only be detached once its cursor and the live table's are
+    finished, hence the split by month.
+    """
+    query = """
+    SELECT w.id, c.name AS city_name, w.weather, w.temp, w.pressure, w.humidity,
+           w.temp_min, w.temp_max, w.date, {derived}
+    FROM {schema}.Weather w
+    JOIN {schema}.City c ON w.city_id = c.id
+    WHERE w.date >= ? AND w.date < ?{city_filter}
+    ORDER BY w.date, w.id
+    """
+    city_filter = " AND c.name = ?" if city is not None else ""
+    derived = ", ".join(f"w.{column}" for column in DERIVED_COLUMNS)
+
+    for month in months_between(start, end):
+        lower = max(start, f"{month}-01")
+        upper = min(end, f"{next_month(month)}-01")
+        if lower >= upper:
+            continue
+        params = [lower, upper] + ([city] if city is not None else [])
+
+        filename = archive_filename(month, archive_dir)
+        attached = os.path.exists(filename)
+        if attached:
+            conn.execute("ATTACH DATABASE ? AS archive", (filename,))
+        cursors = []
+        try:
+            cursor = conn.cursor()
+            cursors.append(cursor)
+            cursor.execute(query.format(schema="main", derived=derived, city_filter=city_filter), params)
+            if attached:
+                cursor = conn.cursor()
+                cursors.append(cursor)
+                # Archives written before the derived columns existed only get
+                # them on their next archive run; until then they read as NULL.
+                columns = table_columns(cursor, "Weather", "archive")
+                archive_derived = ", ".join(
+                    f"w.{column}" if column in columns else "NULL" for column in DERIVED_COLUMNS)
+                cursor.execute(query.format(schema="archive", derived=archive_derived, city_filter=city_filter),
+                               params)
+            yield from heapq.merge(*cursors, key=lambda row: (row[8], row[0]))
+        finally:
+            for cursor in cursors:
+                cursor.close()
+            if attached:
+                conn.execute("DETACH DATABASE archive")
+
+
+def archive_weather_data(max_age_days=MAX_AGE_DAYS):
+    try:
+        with ConnectionManager(DB_FILENAME) as manager, manager.writer() as conn:
+            moved = archive_old_rows(conn, max_age_days)
+        print(f"Archived {moved} weather rows older than {max_age_days} days.")
+    except sqlite3.DatabaseError as e:
+        print(f"Database error while archiving data: {e}")
+    except Exception as e:
+        print(f"Unexpected error while archiving data: {e}")
+
+
+if __name__ == "__main__":
+    archive_weather_data(int(sys.argv[1]) if len(sys.argv) > 1 else MAX_AGE_DAYS)
@@ -0,0 +1,317 @@
+import argparse
+import gzip
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from Exceptions.my_exceptions import ReaderTimeoutError
+from src.db import ConnectionManager
+from src.readDB import read_latest_weather
+from src.retention import ARCHIVE_DIR, archive_filename, iter_weather_range, months_between
+
+DB_FILENAME = "weather_data.db"
+CACHE_SIZE = 256
+GZIP_MIN_BYTES = 1024
+STREAM_MIN_ROWS = 5000
+STREAM_CHUNK_ROWS = 1000
+# A streamed response keeps its reader connection until the client has
+# downloaded it, so only some of the pool's readers may be streaming, and
+# a request waits at most READER_TIMEOUT seconds for a reader.
+MAX_READERS = 8
+MAX_STREAMS = 4
+READER_TIMEOUT = 5.0
+
+WEATHER_KEYS = ("id", "city", "weather", "temp", "pressure", "humidity", "temp_min", "temp_max", "date",
+                "temp_c", "temp_f", "dew_point_c", "heat_index_c")
+LATEST_KEYS = WEATHER_KEYS[1:]
+
+
+class ResultCache:
+    """Thread-safe LRU cache of encoded response bodies."""
+
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+
+class WeatherService:
+    """Read-only queries over the weather store, with cached results.
+
+    Cached results are dropped whenever another connection commits to the
+    database (an ingest, an archive run), detected through SQLite's
+    `PRAGMA data_version`. A result is only cached if no such commit was
+    detected while it was being read, so a slow request can't put data
+    from before an ingest back into the cache.
+    """
+
+    def __init__(self, filename=DB_FILENAME, archive_dir=ARCHIVE_DIR, cache_size=CACHE_SIZE,
+                 max_streams=MAX_STREAMS, reader_timeout=READER_TIMEOUT):
+        self.filename = filename
+        self.archive_dir = archive_dir
+        self.manager = ConnectionManager(filename, max_readers=MAX_READERS, reader_timeout=reader_timeout)
+        self.stream_slots = threading.BoundedSemaphore(max_streams)
+        self.cache = ResultCache(cache_size)
+        self._version_conn = sqlite3.connect(filename, check_same_thread=False)
+        self._version_lock = threading.Lock()
+        self._data_version = None
+
+    def check_for_ingest(self):
+        """Clear the cache if the database changed; returns the data version
+        to pass to cache_result."""
+        with self._version_lock:
+            version = self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self._data_version = version
+                self.cache.clear()
+            return version
+
+    def cache_result(self, key, body, version):
+        """Cache `body`, read at data version `version`, unless a newer
+        version has been seen since."""
+        with self._version_lock:
+            if version == self._data_version:
+                self.cache.put(key, body)
+
+    def latest(self):
+        with self.manager.reader() as conn:
+            return [dict(zip(LATEST_KEYS, row)) for row in read_latest_weather(conn)]
+
+    def weather_range(self, start, end, city=None):
+        """Generator over the range's rows; it holds a reader connection
+        until exhausted or closed."""
+        with self.manager.reader() as conn:
+            yield from iter_weather_range(conn, start, end, city, self.archive_dir)
+
+    def aggregate(self, start, end, city=None):
+        """Per-city count, min/avg/max temperature and average humidity and
+        pressure, merged across the live table and the archives."""
+        city_filter = " AND c.name = ?" if city is not None else ""
+        query = f"""
+        SELECT c.name, COUNT(*), MIN(w.temp), MAX(w.temp), SUM(w.temp),
+               SUM(w.humidity), SUM(w.pressure)
+        FROM {{schema}}.Weather w
+        JOIN {{schema}}.City c ON w.city_id = c.id
+        WHERE w.date >= ? AND w.date < ?{city_filter}
+        GROUP BY c.name
+        """
+        params = [start, end] + ([city] if city is not None else [])
+
+        archives = [archive_filename(month, self.archive_dir) for month in months_between(start, end)]
+        sources = [None] + [filename for filename in archives if os.path.exists(filename)]
+
+        totals = {}
+        with self.manager.reader() as conn:
+            for filename in sources:
+                if filename is not None:
+                    conn.execute("ATTACH DATABASE ? AS archive", (filename,))
+                try:
+                    schema = "main" if filename is None else "archive"
+                    for name, count, low, high, temp, humidity, pressure in conn.execute(
+                            query.format(schema=schema), params):
+                        total = totals.setdefault(name, [0, low, high, 0.0, 0.0, 0.0])
+                        total[0] += count
+                        total[1] = min(total[1], low)
+                        total[2] = max(total[2], high)
+                        total[3] += temp
+                        total[4] += humidity
+                        total[5] += pressure
+                finally:
+                    if filename is not None:
+                        conn.execute("DETACH DATABASE archive")
+
+        return [{
+            "city": name,
+            "count": count,
+            "temp_min": low,
+            "temp_max": high,
+            "temp_avg": temp / count,
+            "humidity_avg": humidity / count,
+            "pressure_avg": pressure / count
+        } for name, (count, low, high, temp, humidity, pressure) in sorted(totals.items())]
+
+    def close(self):
+        self.manager.close()
+        self._version_conn.close()
+
+
+class WeatherRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY every
+    # keep-alive response waits on a delayed ACK.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        service = self.server.service
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        try:
+            version = service.check_for_ingest()
+            cache_key = (url.path, tuple(sorted(params.items())))
+            body = service.cache.get(cache_key)
+            if body is not None:
+                return self.send_body(200, body)
+
+            if url.path == "/latest":
+                body = self.encode(service.latest())
+
+            elif url.path in ("/range", "/aggregate"):
+                if "start" not in params or "end" not in params:
+                    return self.send_error_json(400, "start and end are required")
+                if url.path == "/aggregate":
+                    body = self.encode(service.aggregate(params["start"], params["end"], params.get("city")))
+                else:
+                    rows = service.weather_range(params["start"], params["end"], params.get("city"))
+                    try:
+                        # Only the first STREAM_MIN_ROWS rows are read up
+                        # front; a larger range is streamed off the cursor.
+                        head = list(itertools.islice(rows, STREAM_MIN_ROWS))
+                        if len(head) >= STREAM_MIN_ROWS:
+                            if not service.stream_slots.acquire(blocking=False):
+                                return self.send_error_json(503, "Too many large responses in progress, retry later")
+                            try:
+                                return self.send_stream(itertools.chain(head, rows))
+                            finally:
+                                service.stream_slots.release()
+                    finally:
+                        rows.close()
+                    body = self.encode([dict(zip(WEATHER_KEYS, row)) for row in head])
+
+            else:
+                return self.send_error_json(404, f"Unknown endpoint {url.path}")
+
+            service.cache_result(cache_key, body, version)
+            self.send_body(200, body)
+
+        except ReaderTimeoutError as e:
+            self.send_error_json(503, f"Service busy: {e}")
+        except sqlite3.DatabaseError as e:
+            self.send_error_json(500, f"Database error while reading data: {e}")
+        except Exception as e:
+            self.send_error_json(500, f"Unexpected error while reading data: {e}")
+
+    def do_POST(self):
+        self.send_error_json(405, "Read-only service")
+
+    do_PUT = do_DELETE = do_PATCH = do_POST
+
+    def encode(self, data):
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    def accepts_gzip(self):
+        return "gzip" in self.headers.get("Accept-Encoding", "")
+
+    def send_body(self, status, body):
+        gzipped = self.accepts_gzip() and len(body) >= GZIP_MIN_BYTES
+        if gzipped:
+            body = gzip.compress(body, compresslevel=5)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        self.send_body(status, self.encode({"error": message}))
+
+    def send_stream(self, rows):
+        """Send a large JSON array with chunked transfer encoding, encoding
+        (and optionally compressing) STREAM_CHUNK_ROWS rows at a time."""
+        gzipped = self.accepts_gzip()
+        compressor = zlib.compressobj(5, zlib.DEFLATED, 31) if gzipped else None
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_chunk(data):
+            if compressor is not None:
+                data = compressor.compress(data)
+            if data:
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+        rows = iter(rows)
+        first = True
+        while True:
+            chunk = [json.dumps(dict(zip(WEATHER_KEYS, row)), separators=(",", ":"))
+                     for row in itertools.islice(rows, STREAM_CHUNK_ROWS)]
+            if not chunk:
+                break
+            write_chunk(("[" if first else ",").encode("utf-8") + ",".join(chunk).encode("utf-8"))
+            first = False
+        write_chunk(b"[]" if first else b"]")
+
+        if compressor is not None:
+            tail = compressor.flush()
+            self.wfile.write(f"{len(tail):X}\r\n".encode("ascii") + tail + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def create_server(host="127.0.0.1", port=8080, filename=DB_FILENAME, archive_dir=ARCHIVE_DIR, verbose=False):
+    server = ThreadingHTTPServer((host, port), WeatherRequestHandler)
+    server.daemon_threads = True
+    server.service = WeatherService(filename, archive_dir)
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only HTTP/JSON service over the weather store")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", default=DB_FILENAME)
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.db, args.archive_dir, args.verbose)
+    print(f"Serving weather data from {args.db} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import csv
+import math
+import random
+from datetime import datetime, timedelta
+
+from src.csvio import CSV_FIELDS, open_csv
+from src.db import ConnectionManager
+from src.derive import derive_batch
+from src.updateDB import UPSERT_LATEST_WEATHER, create_tables
+
+CITY_NAMES = [
+    "Bengaluru", "Mumbai", "Delhi", "Chennai", "Kolkata", "Hyderabad", "Pune",
+    "Ahmedabad", "Jaipur", "Lucknow", "Kochi", "Guwahati", "Bhopal", "Patna",
+    "London", "Paris", "Berlin", "Madrid", "Oslo", "Cairo", "Nairobi", "Lagos",
+    "Dubai", "Singapore", "Tokyo", "Seoul", "Beijing", "Sydney", "Auckland",
+    "Toronto", "Chicago", "New York", "Mexico City", "Lima", "Sao Paulo",
+    "Buenos Aires", "Moscow", "Istanbul", "Bangkok", "Jakarta"
+]
+
+CONDITIONS = [
+    "clear sky", "few clouds", "scattered clouds", "broken clouds",
+    "overcast clouds", "haze", "mist", "light rain", "moderate rain",
+    "thunderstorm"
+]
+
+START_DATE = datetime(2025, 1, 1)
+
+
+def city_names(n_cities):
+    names = CITY_NAMES[:n_cities]
+    names += [f"City-{index:05d}" for index in range(len(names), n_cities)]
+    return names
+
+
+def city_climates(n_cities, rng):
+    """Per-city (name, base temp K, daily swing K, base humidity, elevation m)."""
+    return [
+        (name, rng.uniform(268.0, 303.0), rng.uniform(3.0, 9.0),
+         rng.uniform(35.0, 85.0), rng.choice((0, 0, 10, 50, 200, 550, 920, 1500)))
+        for name in city_names(n_cities)
+    ]
+
+
+def corrupt(row, rng):
+    """Damage a row the way real feeds do: placeholders, blanks, thousands
+    separators and units in numeric fields."""
+    damage = rng.randrange(4)
+    if damage == 0:
+        row["temp"] = rng.choice(("N/A", "nan?", "--"))
+    elif damage == 1:
+        row[rng.choice(("pressure", "humidity", "temp_min", "temp_max"))] = ""
+    elif damage == 2:
+        row["pressure"] = f"{row['pressure'] * 1000:,}"
+    else:
+        row["humidity"] = f"{row['humidity']}%"
+    return row
+
+
+def generate_rows(n_cities, n_observations, seed=0, malformed_rate=0.0,
+                  start=START_DATE, interval=timedelta(hours=1)):
+    """Yield n_cities * n_observations weather rows, one city after another
+    within each observation time.
+
+    The same arguments always give the same rows. Each row carries a "date"
+    alongside the CSV fields. A `malformed_rate` fraction of rows is
+    corrupted. Rows are generated lazily, so memory stays flat at any size.
+    """
+    rng = random.Random(seed)
+    climates = city_climates(n_cities, rng)
+
+    for step in range(n_observations):
+        when = start + interval * step
+        day_phase = math.sin(2 * math.pi * (when.hour - 9) / 24)
+        season = math.cos(2 * math.pi * (when.timetuple().tm_yday - 200) / 365)
+        date = when.strftime("%Y-%m-%d %H:%M:%S")
+
+        for name, base, swing, base_humidity, elevation in climates:
+            temp = base + swing * day_phase + 6.0 * season + rng.gauss(0, 1.2)
+            humidity = min(100.0, max(5.0, base_humidity - 2.5 * swing * day_phase + rng.gauss(0, 6)))
+            pressure = round(1013 + rng.gauss(0, 6))
+            row = {
+                "city": name,
+                "weather": rng.choice(CONDITIONS),
+                "temp": round(temp, 2),
+                "feels_like": round(temp + (humidity - 50) * 0.03, 2),
+                "temp_min": round(temp - rng.uniform(0, 2), 2),
+                "temp_max": round(temp + rng.uniform(0, 2), 2),
+                "pressure": pressure,
+                "humidity": round(humidity),
+                "sea_level": pressure,
+                "grnd_level": round(pressure - elevation / 8.3),
+                "date": date
+            }
+            if malformed_rate and rng.random() < malformed_rate:
+                row = corrupt(row, rng)
+            yield row
+
+
+def write_csv(filename, n_cities, n_observations, seed=0, malformed_rate=0.0):
+    """Write a weather.csv-style file; .gz and .zst names are compressed.
+    Returns the row count."""
+    count = 0
+    with open_csv(filename, mode="w") as file:
+        writer = csv.DictWriter(file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for row in generate_rows(n_cities, n_observations, seed, malformed_rate):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def build_db(filename, n_cities, n_observations, seed=0, batch_size=10000):
+    """Create a populated weather database. Returns the number of Weather rows."""
+    with ConnectionManager(filename) as manager, manager.writer() as conn:
+        create_tables(conn)
+        cursor = conn.cursor()
+        cursor.executemany("INSERT OR IGNORE INTO City (name) VALUES (?)",
+                           [(name,) for name in city_names(n_cities)])
+        city_ids = dict(cursor.execute("SELECT name, id FROM City").fetchall())
+
+        count = 0
+        batch = []
+        for row in generate_rows(n_cities, n_observations, seed):
+            batch.append((city_ids[row["city"]], row["weather"], row["temp"], row["pressure"],
+                          row["humidity"], row["temp_min"], row["temp_max"], row["date"]))
+            if len(batch) >= batch_size:
+                count += insert_rows(conn, batch)
+                batch = []
+        if batch:
+            count += insert_rows(conn, batch)
+
+        cursor.execute(UPSERT_LATEST_WEATHER.format(ids="SELECT MAX(id) FROM Weather GROUP BY city_id"))
+    return count
+
+
+def insert_rows(conn, batch):
+    derived = derive_batch([row[2] for row in batch], [row[4] for row in batch])
+    conn.executemany("""
+    INSERT INTO Weather (city_id, weather, temp, pressure, humidity, temp_min, temp_max, date,
+                         dew_point_c, heat_index_c)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(*row, *values) for row, values in zip(batch, derived)])
+    conn.commit()
+    return len(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic weather CSVs and databases")
+    parser.add_argument("kind", choices=["csv", "db"])
+    parser.add_argument("filename")
+    parser.add_argument("--cities", type=int, default=100)
+    parser.add_argument("--observations", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.kind == "csv":
+        count = write_csv(args.filename, args.cities, args.observations, args.seed, args.malformed_rate)
+    else:
+        count = build_db(args.filename, args.cities, args.observations, args.seed)
+    print(f"Wrote {count} rows to {args.filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,40 @@
 import csv
 import sqlite3
 import os
+from src.db import ConnectionManager
+from src.csvio import open_csv
+from src.deadletter import record_failure, ROW
+from src.derive import add_derived_columns, derive_batch
+from src.main import get_config
 
-CSV_FILENAME = "weather.csv"
+# None reads WEATHER_CSV through src.main's config, as append_to_csv does.
+CSV_FILENAME = None
 DB_FILENAME = "weather_data.db"
+WEATHER_FIELDS = ("weather", "temp", "pressure", "humidity", "temp_min", "temp_max")
+BATCH_SIZE = 500
+
+# Copies the selected Weather rows into LatestWeather, keeping only the
+# newest observation per city. Callers run it in the same transaction as
+# the Weather insert.
+UPSERT_LATEST_WEATHER = """
+INSERT INTO LatestWeather (city_id, weather_id, weather, temp, pressure, humidity, temp_min, temp_max, date,
+                           dew_point_c, heat_index_c)
+SELECT city_id, id, weather, temp, pressure, humidity, temp_min, temp_max, date, dew_point_c, heat_index_c
+FROM Weather WHERE id IN ({ids})
+ON CONFLICT(city_id) DO UPDATE SET
+    weather_id = excluded.weather_id,
+    weather = excluded.weather,
+    temp = excluded.temp,
+    pressure = excluded.pressure,
+    humidity = excluded.humidity,
+    temp_min = excluded.temp_min,
+    temp_max = excluded.temp_max,
+    date = excluded.date,
+    dew_point_c = excluded.dew_point_c,
+    heat_index_c = excluded.heat_index_c
+WHERE LatestWeather.date IS NULL
+   OR (excluded.date, excluded.weather_id) >= (LatestWeather.date, LatestWeather.weather_id)
+"""
 
 def create_tables(conn):
     try:
@@ -30,6 +61,33 @@ def create_tables(conn):
         )
         """)
 
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_weather_date ON Weather(date)")
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS LatestWeather (
+            city_id INTEGER PRIMARY KEY,
+            weather_id INTEGER,
+            weather TEXT,
+            temp REAL,
+            pressure REAL,
+            humidity REAL,
+            temp_min REAL,
+            temp_max REAL,
+            date TIMESTAMP,
+            FOREIGN KEY (city_id) REFERENCES City(id)
+        )
+        """)
+
+        # Unit conversions and dew point/heat index; added by ALTER TABLE so
+        # databases created before these columns existed pick them up too.
+        add_derived_columns(cursor, "Weather")
+        add_derived_columns(cursor, "LatestWeather")
+
+        # Backfill once for databases created before LatestWeather existed.
+        cursor.execute("SELECT 1 FROM LatestWeather LIMIT 1")
+        if cursor.fetchone() is None:
+            cursor.execute(UPSERT_LATEST_WEATHER.format(ids="SELECT MAX(id) FROM Weather GROUP BY city_id"))
+
         conn.commit()
     except sqlite3.DatabaseError as e:
         print(f"Database error while creating tables: {e}")
@@ -67,10 +125,11 @@ def insert_city(conn, city_name):
 def insert_weather(conn, city_id, weather_data):
     try:
         cursor = conn.cursor()
+        [(dew_point, heat_index)] = derive_batch([weather_data["temp"]], [weather_data["humidity"]])
 
         cursor.execute("""
-        INSERT INTO Weather (city_id, weather, temp, pressure, humidity, temp_min, temp_max)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO Weather (city_id, weather, temp, pressure, humidity, temp_min, temp_max, dew_point_c, heat_index_c)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             city_id,
             weather_data["weather"],
@@ -78,8 +137,11 @@ def insert_weather(conn, city_id, weather_data):
             weather_data["pressure"],
             weather_data["humidity"],
             weather_data["temp_min"],
-            weather_data["temp_max"]
+            weather_data["temp_max"],
+            dew_point,
+            heat_index
         ))
+        cursor.execute(UPSERT_LATEST_WEATHER.format(ids="?"), (cursor.lastrowid,))
 
         conn.commit()
     except sqlite3.IntegrityError as e:
@@ -92,42 +154,113 @@ def insert_weather(conn, city_id, weather_data):
         print(f"Unexpected error while inserting weather data: {e}")
         raise
 
-def write_weather_data_to_db(conn):
+def insert_weather_batch(conn, batch):
+    """Insert (city_id, weather_data) pairs and update LatestWeather in a
+    single transaction. Dew point and heat index are derived for the whole
+    batch at once."""
+    try:
+        cursor = conn.cursor()
+        derived = derive_batch([weather_data["temp"] for _, weather_data in batch],
+                               [weather_data["humidity"] for _, weather_data in batch])
+
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM Weather")
+        last_id = cursor.fetchone()[0]
+
+        cursor.executemany("""
+        INSERT INTO Weather (city_id, weather, temp, pressure, humidity, temp_min, temp_max,
+                             dew_point_c, heat_index_c)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (city_id, *(weather_data[field] for field in WEATHER_FIELDS), *values)
+            for (city_id, weather_data), values in zip(batch, derived)
+        ])
+        cursor.execute(
+            UPSERT_LATEST_WEATHER.format(ids="SELECT MAX(id) FROM Weather WHERE id > ? GROUP BY city_id"),
+            (last_id,)
+        )
+
+        conn.commit()
+    except sqlite3.DatabaseError as e:
+        conn.rollback()
+        print(f"Database error while inserting weather batch: {e}")
+        raise
+    except Exception as e:
+        conn.rollback()
+        print(f"Unexpected error while inserting weather batch: {e}")
+        raise
+
+def parse_weather_row(row):
+    return {
+        "weather": row["weather"],
+        "temp": float(row["temp"]),
+        "pressure": float(row["pressure"]),
+        "humidity": float(row["humidity"]),
+        "temp_min": float(row["temp_min"]),
+        "temp_max": float(row["temp_max"])
+    }
+
+def csv_filename():
+    return CSV_FILENAME or get_config().csv_filename
+
+def write_weather_data_to_db(conn, batch_size=BATCH_SIZE):
     try:
-        if not os.path.exists(CSV_FILENAME):
-            print(f"{CSV_FILENAME} not found!")
+        filename = csv_filename()
+        if not os.path.exists(filename):
+            print(f"{filename} not found!")
             return
 
-        with open(CSV_FILENAME, mode="r", encoding="utf-8") as file:
+        # Repeated polls of an unchanged observation are already dropped by
+        # fetch_weather (same `dt`), so every CSV row is a real observation,
+        # even when its readings match the previous one.
+        city_ids = {}
+        batch = []
+        batch_rows = []
+
+        def flush():
+            # A failed batch goes to the dead-letter file row by row instead
+            # of aborting the whole ingest.
+            try:
+                insert_weather_batch(conn, batch)
+            except sqlite3.DatabaseError as e:
+                for failed_row in batch_rows:
+                    record_failure(ROW, failed_row, e)
+            batch.clear()
+            batch_rows.clear()
+
+        with open_csv(filename, mode="r") as file:
             reader = csv.DictReader(file)
 
             for row in reader:
                 try:
                     city_name = row["city"]
 
-                    city_id = insert_city(conn, city_name)
-
-                    weather_data = {
-                        "weather": row["weather"],
-                        "temp": float(row["temp"]),
-                        "pressure": float(row["pressure"]),
-                        "humidity": float(row["humidity"]),
-                        "temp_min": float(row["temp_min"]),
-                        "temp_max": float(row["temp_max"])
-                    }
+                    if city_name not in city_ids:
+                        city_ids[city_name] = insert_city(conn, city_name)
+                    city_id = city_ids[city_name]
 
-                    insert_weather(conn, city_id, weather_data)
+                    weather_data = parse_weather_row(row)
+                    batch.append((city_id, weather_data))
+                    batch_rows.append(row)
 
                 except KeyError as e:
                     print(f"Missing expected column in CSV: {e}")
+                    record_failure(ROW, row, e)
                     continue
                 except ValueError as e:
                     print(f"Invalid value encountered while processing row: {e}")
+                    record_failure(ROW, row, e)
                     continue
                 except Exception as e:
                     print(f"Unexpected error while processing row: {e}")
+                    record_failure(ROW, row, e)
                     continue
 
+                if len(batch) >= batch_size:
+                    flush()
+
+        if batch:
+            flush()
+
         print("Weather data successfully updated from CSV into SQLite.")
 
     except FileNotFoundError as e:
@@ -140,10 +273,9 @@ def write_weather_data_to_db(conn):
 
 def update_db_from_csv():
     try:
-        conn = sqlite3.connect(DB_FILENAME)
-        create_tables(conn)
-        write_weather_data_to_db(conn)
-        conn.close()
+        with ConnectionManager(DB_FILENAME) as manager, manager.writer() as conn:
+            create_tables(conn)
+            write_weather_data_to_db(conn)
     except sqlite3.DatabaseError as e:
         print(f"Database error while updating data: {e}")
     except Exception as e:
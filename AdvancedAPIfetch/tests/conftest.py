@@ -0,0 +1,19 @@
+import pytest
+import src.deadletter as deadletter
+from src.synthetic import build_db
+
+
+@pytest.fixture(autouse=True)
+def dead_letter_file(tmp_path, monkeypatch):
+    filename = str(tmp_path / "dead_letter.jsonl")
+    monkeypatch.setattr(deadletter, "DEAD_LETTER_FILENAME", filename)
+    return filename
+
+
+@pytest.fixture
+def synthetic_db(tmp_path):
+    """A small pre-populated database from the synthetic generator:
+    20 cities x 48 hourly observations starting 2025-01-01."""
+    filename = str(tmp_path / "synthetic.db")
+    build_db(filename, n_cities=20, n_observations=48, seed=7)
+    return filename
@@ -0,0 +1,154 @@
+import pytest
+import requests
+from unittest.mock import Mock, patch
+import src.main as my_functions
+import src.breaker as breaker_module
+from src.breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from Exceptions.my_exceptions import CircuitOpenError, ClientError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(breaker_module.time, "time", lambda: now[0])
+    return now
+
+
+def server_error_response():
+    response = Mock()
+    response.status_code = 500
+    response.headers = {"Content-Type": "application/json; charset=utf-8"}
+    response.json.return_value = {"message": "Internal Server Error"}
+    return response
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_half_open_allows_single_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+
+    clock[0] += 10
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_breaker_half_open_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock[0] += 10
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_state_file_is_shared(tmp_path, clock):
+    state_file = str(tmp_path / "breaker.json")
+    worker_a = CircuitBreaker(failure_threshold=2, reset_timeout=10, state_file=state_file)
+    worker_b = CircuitBreaker(failure_threshold=2, reset_timeout=10, state_file=state_file)
+
+    worker_a.record_failure()
+    worker_b.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        worker_a.before_call()
+
+
+def test_fetch_weather_fails_fast_when_open(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    with patch('requests.post', return_value=server_error_response()) as mock_post:
+        with pytest.raises(CircuitOpenError):
+            my_functions.fetch_weather(retries=5, delay=0, breaker=breaker)
+
+        assert mock_post.call_count == 2
+
+        with pytest.raises(CircuitOpenError):
+            my_functions.fetch_weather(retries=5, delay=0, breaker=breaker)
+
+        assert mock_post.call_count == 2
+
+
+def test_fetch_weather_timeouts_trip_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    with patch('requests.post', side_effect=requests.exceptions.Timeout):
+        with pytest.raises(requests.exceptions.Timeout):
+            my_functions.fetch_weather(retries=2, delay=0, breaker=breaker)
+
+    assert breaker.state == OPEN
+
+
+def html_response(status):
+    response = Mock()
+    response.status_code = status
+    response.headers = {"Content-Type": "text/html; charset=utf-8"}
+    response.content = b"<html><body>Bad Gateway</body></html>"
+    return response
+
+
+def test_fetch_weather_html_502_counts_once_per_attempt(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=60)
+
+    with patch('requests.post', return_value=html_response(502)) as mock_post:
+        with pytest.raises(Exception, match="Network error"):
+            my_functions.fetch_weather(retries=3, delay=0, breaker=breaker)
+
+    assert mock_post.call_count == 3
+    assert breaker.failures == 3
+    assert breaker.state == CLOSED
+
+
+def test_fetch_weather_non_json_200_trips_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+    with patch('requests.post', return_value=html_response(200)):
+        with pytest.raises(Exception, match="Network error"):
+            my_functions.fetch_weather(retries=3, delay=0, breaker=breaker)
+
+    assert breaker.state == OPEN
+
+
+def test_fetch_weather_client_error_does_not_trip_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    response = Mock()
+    response.status_code = 404
+    response.headers = {"Content-Type": "application/json; charset=utf-8"}
+    response.json.return_value = {"message": "city not found"}
+
+    with patch('requests.post', return_value=response):
+        with pytest.raises(ClientError):
+            my_functions.fetch_weather(city="Nowhere", breaker=breaker)
+
+    assert breaker.state == CLOSED
+
+
+def test_main_reports_open_circuit():
+    with patch('src.main.fetch_weather', side_effect=CircuitOpenError("Circuit open, retry in 30s")):
+        with patch('builtins.print') as mock_print:
+            my_functions.main()
+            mock_print.assert_any_call("Weather API unavailable, skipped: Circuit open, retry in 30s")
@@ -0,0 +1,104 @@
+import sqlite3
+import pytest
+from unittest.mock import Mock, patch, mock_open
+import src.main as my_functions
+import src.updateDB as updateDB
+from src.changes import ObservationTracker, fingerprint
+
+
+def make_response(status=200, dt=1750239667, headers=None):
+    response = Mock()
+    response.status_code = status
+    response.headers = {"Content-Type": "application/json; charset=utf-8", **(headers or {})}
+    response.json.return_value = {
+        "weather": [{"description": "broken clouds"}],
+        "main": {"temp": 302.04, "pressure": 996, "humidity": 53, "temp_min": 302.04, "temp_max": 302.04},
+        "dt": dt
+    }
+    return response
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_tracker_persists_state(tmp_path):
+    filename = str(tmp_path / "state.json")
+    tracker = ObservationTracker(filename)
+    tracker.record("Delhi", dt=10, headers={"ETag": '"abc"'})
+    tracker.save()
+
+    reloaded = ObservationTracker(filename)
+    assert reloaded.is_unchanged("Delhi", dt=10)
+    assert not reloaded.is_unchanged("Delhi", dt=11)
+    assert reloaded.conditional_headers("Delhi") == {"If-None-Match": '"abc"'}
+
+
+def test_tracker_ignores_corrupt_state(tmp_path):
+    filename = tmp_path / "state.json"
+    filename.write_text("{not json")
+
+    tracker = ObservationTracker(str(filename))
+    assert tracker.state == {}
+
+
+def test_fetch_weather_skips_same_dt():
+    tracker = ObservationTracker()
+
+    with patch('requests.post', return_value=make_response()):
+        assert my_functions.fetch_weather(city="Delhi", tracker=tracker)["temp"] == 302.04
+        assert my_functions.fetch_weather(city="Delhi", tracker=tracker) is None
+
+    with patch('requests.post', return_value=make_response(dt=1750243267)):
+        assert my_functions.fetch_weather(city="Delhi", tracker=tracker) is not None
+
+
+def test_fetch_weather_sends_validators_and_handles_304():
+    tracker = ObservationTracker()
+    tracker.record("Delhi", headers={"ETag": '"v1"', "Last-Modified": "Wed, 18 Jun 2025 09:41:07 GMT"})
+
+    not_modified = Mock()
+    not_modified.status_code = 304
+    not_modified.headers = {}
+
+    with patch('requests.post', return_value=not_modified) as mock_post:
+        assert my_functions.fetch_weather(city="Delhi", tracker=tracker) is None
+
+    headers = mock_post.call_args.kwargs["headers"]
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == "Wed, 18 Jun 2025 09:41:07 GMT"
+
+
+def test_main_skips_csv_append_when_unchanged(monkeypatch):
+    monkeypatch.setattr("src.changes.ObservationTracker", lambda _filename: ObservationTracker())
+    mock_open_obj = mock_open()
+
+    with patch('src.main.fetch_weather', return_value=None):
+        with patch("builtins.open", mock_open_obj):
+            with patch('builtins.print') as mock_print:
+                my_functions.main()
+
+    mock_open_obj.assert_not_called()
+    mock_print.assert_any_call("No new observation for Bengaluru, skipping CSV append")
+
+
+def test_write_weather_data_to_db_keeps_identical_readings(monkeypatch, capsys):
+    # Two real observations can carry the same readings (overnight, say);
+    # repeats are dropped by `dt` at fetch time, not by value at ingest.
+    conn = sqlite3.connect(":memory:")
+    updateDB.create_tables(conn)
+    monkeypatch.setattr(updateDB.os.path, "exists", lambda _: True)
+
+    csv_content = """city,weather,temp,pressure,humidity,temp_min,temp_max
+Mumbai,Clear sky,300,1013,70,298,302
+Mumbai,Clear sky,300,1013,70,298,302
+Mumbai,Clear sky,301,1013,70,298,302
+"""
+    monkeypatch.setattr("builtins.open", mock_open(read_data=csv_content))
+
+    updateDB.write_weather_data_to_db(conn)
+
+    assert conn.execute("SELECT COUNT(*) FROM Weather").fetchone()[0] == 3
+    assert "unchanged" not in capsys.readouterr().out
+    conn.close()
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+from unittest.mock import Mock, patch
+import pytest
+import src.cli as cli
+import src.main as my_functions
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_has_no_side_effects():
+    deferred = "{'requests', 'dotenv', 'csv', 'gzip', 'orjson', 'msgspec', 'dataclasses'}"
+    code = f"import sys, src.main; print(sorted({deferred} & set(sys.modules)), src.main._config)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[] None"
+
+
+def test_config_is_loaded_once(monkeypatch):
+    monkeypatch.setattr(my_functions, "_config", None)
+    monkeypatch.setenv("API_KEY", "from-env")
+    monkeypatch.setenv("WEATHER_CSV", "other.csv")
+
+    with patch("dotenv.load_dotenv") as mock_load:
+        config = my_functions.get_config()
+        assert my_functions.get_config() is config
+
+    mock_load.assert_called_once()
+    assert (config.api_key, config.csv_filename) == ("from-env", "other.csv")
+    assert my_functions.api_key == "from-env"
+
+
+def test_fetch_weather_resolves_key_lazily(monkeypatch):
+    config = Mock(api_key="lazy-key")
+    monkeypatch.setattr(my_functions, "_config", config)
+
+    with patch("requests.post", side_effect=my_functions.ClientError("401 Invalid API key")) as mock_post:
+        with pytest.raises(my_functions.ClientError):
+            my_functions.fetch_weather(city="Delhi", retries=1)
+
+    assert mock_post.call_args.kwargs["params"]["appid"] == "lazy-key"
+
+
+def test_cli_fetch_passes_city():
+    with patch.object(my_functions, "main") as mock_main:
+        cli.main(["fetch", "--city", "Delhi"])
+
+    mock_main.assert_called_once_with(city="Delhi")
+
+
+def test_cli_passes_arguments_through(monkeypatch):
+    import src.synthetic as synthetic
+    seen = []
+    monkeypatch.setattr(sys, "argv", ["pytest"])
+    monkeypatch.setattr(synthetic, "main", lambda: seen.append(sys.argv[1:]))
+
+    cli.main(["synth", "csv", "out.csv", "--cities", "3"])
+
+    assert seen == [["csv", "out.csv", "--cities", "3"]]
+
+
+def test_cli_rejects_unknown_arguments():
+    with pytest.raises(SystemExit):
+        cli.main(["ingest", "--bogus"])
+
+
+def test_ingest_and_pipeline_use_configured_csv(monkeypatch):
+    import src.pipeline as pipeline
+    import src.updateDB as updateDB
+    monkeypatch.setattr(my_functions, "_config", Mock(csv_filename="configured.csv.gz"))
+    assert updateDB.csv_filename() == "configured.csv.gz"
+
+    monkeypatch.setattr(updateDB, "CSV_FILENAME", "override.csv")
+    assert updateDB.csv_filename() == "override.csv"
+
+    seen = []
+    monkeypatch.setattr(sys, "argv", ["pipeline"])
+    monkeypatch.setattr(pipeline, "Pipeline", lambda *args: seen.append(args[1]) or Mock(**{"run.return_value": {}}))
+    pipeline.main()
+    assert seen == ["configured.csv.gz"]
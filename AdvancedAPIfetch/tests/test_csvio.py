@@ -0,0 +1,110 @@
+import csv
+import gzip
+import os
+import sqlite3
+import pytest
+import src.csvio as csvio
+import src.main as my_functions
+import src.updateDB as updateDB
+from src.csvio import codec_for, open_csv
+from src.synthetic import generate_rows
+
+FIELDS = ["city", "weather", "temp", "pressure", "humidity", "temp_min", "temp_max"]
+
+
+def append_rows(filename, rows, write_header):
+    with open_csv(filename, mode="w" if write_header else "a") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def row(city, temp):
+    return {"city": city, "weather": "Clear sky", "temp": temp, "pressure": 1013,
+            "humidity": 70, "temp_min": 298, "temp_max": 302}
+
+
+def test_codec_for():
+    assert codec_for("weather.csv") is None
+    assert codec_for("weather.csv.gz") == "gzip"
+    assert codec_for("WEATHER.CSV.ZST") == "zstd"
+
+
+@pytest.mark.parametrize("extension", [".csv", ".csv.gz", ".csv.zst"])
+def test_append_segments_round_trip(tmp_path, extension):
+    if extension == ".csv.zst" and csvio.zstandard is None:
+        pytest.skip("zstandard not installed")
+    filename = str(tmp_path / f"weather{extension}")
+
+    append_rows(filename, [row("Mumbai", 300)], write_header=True)
+    append_rows(filename, [row("Delhi", 305)], write_header=False)
+    append_rows(filename, [row("Mumbai", 301)], write_header=False)
+
+    with open_csv(filename) as file:
+        temps = [(r["city"], r["temp"]) for r in csv.DictReader(file)]
+
+    assert temps == [("Mumbai", "300"), ("Delhi", "305"), ("Mumbai", "301")]
+
+
+def test_small_appends_collect_in_tail(tmp_path, monkeypatch):
+    monkeypatch.setattr(csvio, "SEGMENT_BYTES", 50)
+    filename = str(tmp_path / "weather.csv.gz")
+    append_rows(filename, [row("Mumbai", 300)], write_header=True)
+    first_size = os.path.getsize(filename)
+
+    append_rows(filename, [row("Delhi", 305)], write_header=False)
+    assert os.path.getsize(filename) == first_size
+    append_rows(filename, [row("Pune", 303)], write_header=False)
+    assert not os.path.exists(csvio.tail_filename(filename))
+
+    with open(filename, mode="rb") as file:
+        data = file.read()
+    # Both buffered rows went into a single new member.
+    assert data.count(b"\x1f\x8b") == 2
+    assert data[first_size:first_size + 2] == b"\x1f\x8b"
+    assert gzip.decompress(data).decode("utf-8").count("\n") == 4
+
+
+@pytest.mark.parametrize("extension", [".csv.gz", ".csv.zst"])
+def test_row_by_row_appends_compress(tmp_path, extension):
+    if extension == ".csv.zst" and csvio.zstandard is None:
+        pytest.skip("zstandard not installed")
+    plain = str(tmp_path / "weather.csv")
+    compressed = str(tmp_path / f"weather{extension}")
+
+    # One append per fetched row, as main() and the Lambda do.
+    for observation in generate_rows(5, 400, seed=1):
+        del observation["date"]
+        my_functions.append_to_csv(observation, filename=plain)
+        my_functions.append_to_csv(observation, filename=compressed)
+
+    tail = csvio.tail_filename(compressed)
+    size = os.path.getsize(compressed) + (os.path.getsize(tail) if os.path.exists(tail) else 0)
+    # Never larger than plain text, however the tail is split.
+    assert size < os.path.getsize(plain)
+    csvio.compact(compressed)
+    assert os.path.getsize(compressed) < os.path.getsize(plain) / 3
+
+    with open_csv(compressed) as file, open_csv(plain) as plain_file:
+        assert list(csv.DictReader(file)) == list(csv.DictReader(plain_file))
+
+
+def test_zstd_missing_raises(tmp_path, monkeypatch):
+    monkeypatch.setattr(csvio, "zstandard", None)
+
+    with pytest.raises(ImportError, match="zstandard is required"):
+        open_csv(str(tmp_path / "weather.csv.zst"), mode="w")
+
+
+def test_write_weather_data_to_db_reads_gzip(tmp_path, monkeypatch):
+    filename = str(tmp_path / "weather.csv.gz")
+    append_rows(filename, [row("Mumbai", 300), row("Delhi", 305)], write_header=True)
+    monkeypatch.setattr(updateDB, "CSV_FILENAME", filename)
+
+    conn = sqlite3.connect(":memory:")
+    updateDB.create_tables(conn)
+    updateDB.write_weather_data_to_db(conn)
+
+    assert conn.execute("SELECT COUNT(*) FROM Weather").fetchone()[0] == 2
+    conn.close()
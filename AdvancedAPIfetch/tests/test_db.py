@@ -0,0 +1,141 @@
+import sqlite3
+import threading
+import pytest
+from src.db import ConnectionManager
+from Exceptions.my_exceptions import ReaderTimeoutError
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "weather_data.db"))
+    with manager.writer() as conn:
+        conn.execute("CREATE TABLE City (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL)")
+    yield manager
+    manager.close()
+
+
+def test_pragmas_applied(manager):
+    with manager.writer() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+    with manager.reader() as conn:
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -20000
+
+
+def test_reader_connection_returned_to_pool(manager):
+    with manager.reader() as first:
+        pass
+    with manager.reader() as second:
+        pass
+    assert first is second
+
+    other = []
+
+    def read_in_thread():
+        with manager.reader() as conn:
+            other.append(conn)
+
+    thread = threading.Thread(target=read_in_thread)
+    thread.start()
+    thread.join()
+
+    assert other[0] is first
+
+
+def test_readers_are_bounded(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "weather_data.db"), max_readers=2)
+    in_use = []
+    peak = []
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def read():
+        with manager.reader() as conn:
+            with lock:
+                in_use.append(conn)
+                peak.append(len(in_use))
+            release.wait(0.05)
+            with lock:
+                in_use.remove(conn)
+
+    threads = [threading.Thread(target=read) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) <= 2
+    assert len(manager._connections) <= 2
+    manager.close()
+
+
+def test_writer_commits_and_readers_see_it(manager):
+    with manager.writer() as conn:
+        conn.execute("INSERT INTO City (name) VALUES (?)", ("Mumbai",))
+
+    with manager.reader() as conn:
+        assert conn.execute("SELECT name FROM City").fetchall() == [("Mumbai",)]
+
+
+def test_writer_rolls_back_on_error(manager):
+    with pytest.raises(sqlite3.IntegrityError):
+        with manager.writer() as conn:
+            conn.execute("INSERT INTO City (name) VALUES (?)", ("Mumbai",))
+            conn.execute("INSERT INTO City (name) VALUES (?)", ("Mumbai",))
+
+    with manager.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM City").fetchone()[0] == 0
+
+
+def test_reader_is_read_only(manager):
+    with manager.reader() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO City (name) VALUES (?)", ("Delhi",))
+
+
+def test_concurrent_writers_do_not_lock(manager):
+    errors = []
+
+    def write(index):
+        try:
+            for n in range(20):
+                with manager.writer() as conn:
+                    conn.execute("INSERT INTO City (name) VALUES (?)", (f"city-{index}-{n}",))
+        except sqlite3.Error as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with manager.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM City").fetchone()[0] == 80
+
+
+def test_close_releases_connections(manager):
+    with manager.reader() as conn:
+        pass
+    manager.close()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_reader_timeout(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "weather_data.db"), max_readers=1, reader_timeout=0.05)
+
+    with manager.reader():
+        with pytest.raises(ReaderTimeoutError):
+            with manager.reader():
+                pass
+
+    # the slot is free again once the first reader is done
+    with manager.reader() as conn:
+        assert conn.execute("SELECT 1").fetchone() == (1,)
+    manager.close()
@@ -0,0 +1,141 @@
+import sqlite3
+import pytest
+import requests
+from unittest.mock import patch, mock_open
+import src.deadletter as deadletter
+import src.main as my_functions
+import src.replay as replay
+import src.updateDB as updateDB
+from Exceptions.my_exceptions import CircuitOpenError, ClientError, ServerError
+
+
+def row(city, temp):
+    return {"city": city, "weather": "Clear sky", "temp": temp, "pressure": "1013",
+            "humidity": "70", "temp_min": "298", "temp_max": "302"}
+
+
+def test_record_and_read_entries(dead_letter_file):
+    deadletter.record_failure(deadletter.ROW, row("Mumbai", "bad"), ValueError("could not convert"))
+    deadletter.record_failure(deadletter.FETCH, {"city": "Delhi"}, ServerError("500 Internal Server Error"))
+
+    entries = deadletter.read_entries()
+
+    assert [(e["kind"], e["error_class"]) for e in entries] == [("row", "ValueError"), ("fetch", "ServerError")]
+    assert entries[0]["payload"]["temp"] == "bad"
+    assert entries[1]["attempts"] == 0
+
+
+def test_record_failure_never_raises(tmp_path, capsys):
+    deadletter.record_failure(deadletter.FETCH, {"city": "Delhi"}, Exception("x"),
+                              filename=str(tmp_path / "missing" / "dead.jsonl"))
+
+    assert "Could not record dead letter" in capsys.readouterr().out
+
+
+def test_invalid_csv_row_is_dead_lettered(monkeypatch):
+    conn = sqlite3.connect(":memory:")
+    updateDB.create_tables(conn)
+    monkeypatch.setattr(updateDB.os.path, "exists", lambda _: True)
+    invalid_csv = """city,weather,temp,pressure,humidity,temp_min,temp_max\nMumbai,Clear sky,not_a_float,1013,70,298,302"""
+    monkeypatch.setattr("builtins.open", mock_open(read_data=invalid_csv))
+
+    with patch.object(updateDB, "record_failure") as mock_record:
+        updateDB.write_weather_data_to_db(conn)
+
+    kind, payload, error = mock_record.call_args.args
+    assert kind == deadletter.ROW
+    assert payload["temp"] == "not_a_float"
+    assert isinstance(error, ValueError)
+    conn.close()
+
+
+def test_failed_fetch_is_dead_lettered():
+    with patch('src.main.fetch_weather', side_effect=requests.exceptions.Timeout):
+        my_functions.main()
+
+    entries = deadletter.read_entries()
+    assert [(e["kind"], e["payload"], e["error_class"]) for e in entries] == [("fetch", {"city": "Bengaluru"}, "Timeout")]
+
+
+def test_replay_rows(tmp_path):
+    deadletter.record_failure(deadletter.ROW, row("Mumbai", "300"), sqlite3.OperationalError("database is locked"))
+    deadletter.record_failure(deadletter.ROW, row("Delhi", "305"), sqlite3.OperationalError("database is locked"))
+    deadletter.record_failure(deadletter.ROW, row("Delhi", "oops"), ValueError("could not convert"))
+    db_filename = str(tmp_path / "weather_data.db")
+
+    remaining = replay.replay(db_filename=db_filename)
+
+    assert [(e["payload"]["temp"], e["attempts"]) for e in remaining] == [("oops", 1)]
+    assert deadletter.read_entries() == remaining
+
+    conn = sqlite3.connect(db_filename)
+    assert conn.execute("SELECT COUNT(*) FROM Weather").fetchone()[0] == 2
+    conn.close()
+
+
+def test_replay_fetches(monkeypatch):
+    deadletter.record_failure(deadletter.FETCH, {"city": "Delhi"}, requests.exceptions.Timeout())
+    deadletter.record_failure(deadletter.FETCH, {"city": "Nowhere"}, requests.exceptions.Timeout())
+
+    def fake_fetch(city, **kwargs):
+        if city == "Nowhere":
+            raise ServerError("500 Internal Server Error")
+        return {"city": city, "weather": "haze", "temp": 305.0}
+
+    appended = []
+    monkeypatch.setattr(replay, "fetch_weather", fake_fetch)
+    monkeypatch.setattr(replay, "append_to_csv", appended.append)
+    monkeypatch.setattr(replay, "CircuitBreaker", lambda **kwargs: None)
+
+    remaining = replay.replay()
+
+    assert appended == [{"city": "Delhi", "weather": "haze", "temp": 305.0}]
+    assert [(e["payload"]["city"], e["error_class"]) for e in remaining] == [("Nowhere", "ServerError")]
+
+
+@pytest.mark.parametrize("error, transient", [
+    (requests.exceptions.Timeout(), True),
+    (requests.exceptions.ConnectionError(), True),
+    (ServerError("503 Service Unavailable"), True),
+    (CircuitOpenError("Circuit open"), True),
+    (ClientError("401 Invalid API key"), False),
+    (OSError("No space left on device"), False),
+])
+def test_is_transient(error, transient):
+    assert deadletter.is_transient(error) is transient
+
+
+def test_exhausted_network_retries_are_transient():
+    with patch('requests.post', side_effect=requests.exceptions.ConnectionError):
+        with pytest.raises(Exception) as e:
+            my_functions.fetch_weather(retries=1, delay=0)
+
+    assert deadletter.is_transient(e.value)
+
+
+def test_client_error_is_not_dead_lettered():
+    with patch('src.main.fetch_weather', side_effect=ClientError("401 Invalid API key")):
+        my_functions.main()
+
+    assert deadletter.read_entries() == []
+
+
+def test_csv_write_error_is_not_dead_lettered():
+    with patch('src.main.fetch_weather', return_value={"city": "Bengaluru", "temp": 300.0}):
+        with patch('src.main.append_to_csv', side_effect=OSError("No space left on device")):
+            my_functions.main()
+
+    assert deadletter.read_entries() == []
+
+
+def test_replay_drops_client_errors(monkeypatch):
+    deadletter.record_failure(deadletter.FETCH, {"city": "Nowhere"}, ClientError("404 city not found"))
+
+    def fake_fetch(city, **kwargs):
+        raise ClientError("404 city not found")
+
+    monkeypatch.setattr(replay, "fetch_weather", fake_fetch)
+    monkeypatch.setattr(replay, "CircuitBreaker", lambda **kwargs: None)
+
+    assert replay.replay() == []
+    assert deadletter.read_entries() == []
@@ -0,0 +1,79 @@
+import json
+import pytest
+import requests
+from unittest.mock import Mock
+import src.decode as decode
+
+WEATHER_BODY = json.dumps({
+    'weather': [{'id': 803, 'main': 'Clouds', 'description': 'broken clouds', 'icon': '04d'}],
+    'main': {'temp': 302.04, 'temp_min': 302.04, 'temp_max': 302.04, 'pressure': 996, 'humidity': 53},
+    'wind': {'speed': 2.08},
+    'dt': 1750239667,
+    'cod': 200
+}).encode("utf-8")
+
+STOCKS_BODY = json.dumps({
+    "statusCode": 200,
+    "data": {"page": 1, "data": [{"Symbol": "ABC", "Name": "Abc Ltd."}]},
+    "message": "Stocks fetched successfully",
+    "success": True
+}).encode("utf-8")
+
+
+@pytest.fixture(params=["json", "orjson", "msgspec"])
+def backend(request, monkeypatch):
+    if request.param != "json" and getattr(decode, request.param) is None:
+        pytest.skip(f"{request.param} not installed")
+    monkeypatch.setattr(decode, "BACKEND", request.param)
+    return request.param
+
+
+def test_decode_weather(backend):
+    payload = decode.decode_weather(WEATHER_BODY)
+
+    assert payload.main["temp"] == 302.04
+    assert payload.description == "broken clouds"
+    assert payload.dt == 1750239667
+    assert payload.message is None
+
+
+def test_decode_weather_error_message(backend):
+    payload = decode.decode_weather(b'{"cod": "404", "message": "city not found"}')
+
+    assert payload.main is None
+    assert payload.message == "city not found"
+
+
+def test_loads(backend):
+    data = decode.loads(STOCKS_BODY)
+
+    assert data["success"] is True
+    assert data["data"]["data"] == [{"Symbol": "ABC", "Name": "Abc Ltd."}]
+
+
+def test_decode_response_uses_raw_body():
+    response = Mock()
+    response.content = WEATHER_BODY
+
+    payload = decode.decode_weather_response(response)
+
+    assert payload.description == "broken clouds"
+    response.json.assert_not_called()
+
+
+def test_decode_response_falls_back_to_json():
+    response = Mock()
+    response.json.return_value = {"main": {"temp": 300}, "weather": [{"description": "clear sky"}]}
+
+    payload = decode.decode_weather_response(response)
+
+    assert payload.main == {"temp": 300}
+    assert payload.description == "clear sky"
+
+
+def test_decode_response_error_is_request_exception(backend):
+    response = Mock()
+    response.content = b"<html>502 Bad Gateway</html>"
+
+    with pytest.raises(requests.exceptions.JSONDecodeError):
+        decode.decode_weather_response(response)
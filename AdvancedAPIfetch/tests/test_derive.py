@@ -0,0 +1,75 @@
+import sqlite3
+import pytest
+import src.derive as derive
+from src.readDB import read_latest_weather
+from src.updateDB import create_tables, insert_city, insert_weather_batch
+
+
+def weather(temp, humidity):
+    return {"weather": "Clear sky", "temp": temp, "pressure": 1013.0, "humidity": humidity,
+            "temp_min": temp - 1, "temp_max": temp + 1}
+
+
+@pytest.fixture
+def db_connection():
+    conn = sqlite3.connect(":memory:")
+    create_tables(conn)
+    yield conn
+    conn.close()
+
+
+def test_derive_batch_python():
+    # 25C/60% has a dew point of ~16.7C; 32C/70% is ~40.5C on the NWS heat index chart
+    [(dew_point, cool), (_, hot), (no_dew_point, _)] = derive._derive_python(
+        [298.15, 305.15, 290.0], [60.0, 70.0, 0.0])
+
+    assert dew_point == pytest.approx(16.7, abs=0.1)
+    assert cool == pytest.approx(25.0, abs=1.0)
+    assert hot == pytest.approx(40.5, abs=0.5)
+    assert no_dew_point is None
+
+
+def test_derive_batch_numpy_matches_python():
+    pytest.importorskip("numpy")
+    temps = [250.0, 285.5, 298.15, 305.15, 310.0, 301.0, None]
+    humidities = [80.0, 5.0, 60.0, 70.0, 10.0, 90.0, 50.0]
+
+    assert derive._derive_numpy(temps, humidities) == derive._derive_python(temps, humidities)
+
+
+def test_batch_insert_stores_derived_columns(db_connection):
+    city_id = insert_city(db_connection, "Mumbai")
+    insert_weather_batch(db_connection, [(city_id, weather(298.15, 60.0)), (city_id, weather(305.15, 70.0))])
+
+    rows = db_connection.execute("""
+    SELECT temp_c, temp_f, temp_min_c, temp_max_f, dew_point_c, heat_index_c FROM Weather ORDER BY id
+    """).fetchall()
+    assert rows[0][:4] == (25.0, 77.0, 24.0, 78.8)
+    assert rows[0][4:] == tuple(derive.derive_batch([298.15], [60.0])[0])
+
+    [latest] = read_latest_weather(db_connection)
+    assert latest[8:10] == (32.0, 89.6)
+    assert latest[10:] == rows[1][4:]
+
+
+def test_create_tables_migrates_old_schema():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE City (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL)")
+    conn.execute("""
+    CREATE TABLE Weather (id INTEGER PRIMARY KEY AUTOINCREMENT, city_id INTEGER, weather TEXT, temp REAL,
+                          pressure REAL, humidity REAL, temp_min REAL, temp_max REAL,
+                          date TIMESTAMP DEFAULT CURRENT_TIMESTAMP)
+    """)
+    conn.execute("INSERT INTO City (name) VALUES ('Delhi')")
+    conn.executemany("INSERT INTO Weather (city_id, weather, temp, humidity) VALUES (1, 'Haze', ?, ?)",
+                     [(298.15, 60.0), (305.15, 70.0)])
+
+    create_tables(conn)
+    # a second run finds the columns already there
+    create_tables(conn)
+
+    assert conn.execute("SELECT temp_c, dew_point_c FROM Weather WHERE id = 1").fetchone() == (
+        25.0, derive.derive_batch([298.15], [60.0])[0][0])
+    assert conn.execute("SELECT dew_point_c, heat_index_c FROM LatestWeather").fetchone() == tuple(
+        derive.derive_batch([305.15], [70.0])[0])
+    conn.close()
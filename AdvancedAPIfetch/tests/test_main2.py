@@ -156,6 +156,19 @@ def test_network_error_final_attempt_raises():
             my_functions.fetch_weather(retries=2, delay=0)
 
 
+def test_non_json_body_is_retried_like_network_error():
+    html_response = Mock()
+    html_response.status_code = 502
+    html_response.headers = {"Content-Type": "text/html; charset=utf-8"}
+    html_response.content = b"<html><body>502 Bad Gateway</body></html>"
+
+    with patch('requests.post', return_value=html_response) as mock_post:
+        with pytest.raises(Exception, match="Network error: after maximum retries"):
+            my_functions.fetch_weather(retries=3, delay=0)
+
+    assert mock_post.call_count == 3
+
+
 def test_main_timeout_handling(monkeypatch):
     monkeypatch.setenv("API_KEY", "dummy")
     with patch('src.main.fetch_weather', side_effect=requests.exceptions.Timeout):
@@ -0,0 +1,132 @@
+import csv
+import sqlite3
+import time
+import src.deadletter as deadletter
+import src.main as my_functions
+import src.pipeline as pipeline_module
+import src.providers as providers
+from src.csvio import CSV_FIELDS, open_csv
+from src.pipeline import Pipeline
+from src.synthetic import write_csv
+from Exceptions.my_exceptions import ServerError
+
+
+def fake_fetch(city):
+    if city == "Nowhere":
+        raise ServerError("500 Internal Server Error")
+    return {"city": city, "weather": "haze", "temp": 305.0, "pressure": 1000,
+            "humidity": 40, "temp_min": 304.0, "temp_max": 306.0}
+
+
+def count_rows(db_filename):
+    conn = sqlite3.connect(db_filename)
+    count = conn.execute("SELECT COUNT(*) FROM Weather").fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_pipeline_fetch_to_csv_and_db(tmp_path):
+    db_filename = str(tmp_path / "weather_data.db")
+    out_csv = str(tmp_path / "weather.csv.gz")
+    pipeline = Pipeline(db_filename, out_csv, fetch_workers=2, fetch=fake_fetch)
+
+    stats = pipeline.run(["Delhi", "Mumbai", "Nowhere"])
+
+    assert stats["fetched"] == 2
+    assert stats["written"] == 2
+    assert stats["failed"] == 1
+    assert count_rows(db_filename) == 2
+    with open_csv(out_csv) as file:
+        assert sorted(row["city"] for row in csv.DictReader(file)) == ["Delhi", "Mumbai"]
+    assert [e["payload"] for e in deadletter.read_entries()] == [{"city": "Nowhere"}]
+
+
+def test_pipeline_ingests_csv_with_bounded_queue(tmp_path, monkeypatch):
+    csv_filename = str(tmp_path / "big.csv")
+    total = write_csv(csv_filename, 10, 30, seed=5, malformed_rate=0.05)
+    db_filename = str(tmp_path / "weather_data.db")
+
+    insert_weather_batch = pipeline_module.insert_weather_batch
+    def slow_insert(conn, batch):
+        time.sleep(0.01)
+        insert_weather_batch(conn, batch)
+    monkeypatch.setattr(pipeline_module, "insert_weather_batch", slow_insert)
+
+    pipeline = Pipeline(db_filename, queue_size=8, batch_size=16, fetch=fake_fetch)
+    stats = pipeline.run(csv_filename=csv_filename)
+
+    assert stats["read"] == total
+    assert stats["written"] + stats["failed"] == total
+    assert stats["failed"] > 0
+    assert stats["peak_queue_depth"] <= 8
+    assert stats["producer_wait_seconds"] > 0
+    assert stats["peak_rss_mb"] > 0
+    assert count_rows(db_filename) == stats["written"]
+
+
+def test_pipeline_flushes_on_interval(tmp_path):
+    db_filename = str(tmp_path / "weather_data.db")
+
+    def slow_fetch(city):
+        time.sleep(0.2)
+        return fake_fetch(city)
+
+    pipeline = Pipeline(db_filename, batch_size=100, fetch_workers=1, flush_interval=0.05, fetch=slow_fetch)
+    stats = pipeline.run(["Delhi", "Mumbai"])
+
+    assert stats["written"] == 2
+    assert stats["batches"] == 2
+
+
+def test_pipeline_appends_under_existing_header(tmp_path):
+    db_filename = str(tmp_path / "weather_data.db")
+    out_csv = str(tmp_path / "weather.csv")
+    my_functions.append_to_csv({"city": "Delhi", "weather": "haze", "temp": 305.2, "feels_like": 308.1,
+                                "temp_min": 304.0, "temp_max": 306.5, "pressure": 1006, "humidity": 52,
+                                "sea_level": 1006, "grnd_level": 912}, filename=out_csv)
+
+    def fetch(city):
+        row = fake_fetch(city)
+        if city == "Pune":
+            row["wind"] = 3.5
+        return row
+
+    stats = Pipeline(db_filename, out_csv, fetch_workers=1, fetch=fetch).run(["Mumbai", "Pune"])
+
+    assert stats["written"] == 2
+    with open_csv(out_csv) as file:
+        rows = list(csv.DictReader(file))
+    assert [(row["city"], row["pressure"], row["humidity"], row["feels_like"]) for row in rows] == [
+        ("Delhi", "1006", "52", "308.1"), ("Mumbai", "1000", "40", ""), ("Pune", "1000", "40", "")]
+
+
+def test_pipeline_writes_canonical_header(tmp_path):
+    out_csv = str(tmp_path / "weather.csv")
+
+    Pipeline(str(tmp_path / "weather_data.db"), out_csv, fetch=fake_fetch).run(["Mumbai"])
+
+    with open_csv(out_csv) as file:
+        assert next(csv.reader(file)) == CSV_FIELDS
+
+
+def test_pipeline_with_hedged_fetcher_keeps_csv_columns(tmp_path):
+    class Stub(providers.Provider):
+        name = "stub"
+
+        def fetch(self, city, time_out=3):
+            return dict(reversed(list(fake_fetch(city).items())))
+
+    out_csv = str(tmp_path / "weather.csv")
+    fetcher = providers.HedgedFetcher([Stub()])
+    try:
+        stats = Pipeline(str(tmp_path / "weather_data.db"), out_csv, fetch=fetcher.fetch).run(["Delhi", "Mumbai"])
+    finally:
+        fetcher.close()
+
+    assert stats["written"] == 2
+    with open_csv(out_csv) as file:
+        reader = csv.DictReader(file)
+        rows = sorted(reader, key=lambda row: row["city"])
+    assert reader.fieldnames == CSV_FIELDS
+    assert [(row["city"], row["temp_min"], row["pressure"], row["feels_like"]) for row in rows] == [
+        ("Delhi", "304.0", "1000", ""), ("Mumbai", "304.0", "1000", "")]
@@ -0,0 +1,161 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+import src.providers as providers
+from src.csvio import CSV_FIELDS
+from Exceptions.my_exceptions import ServerError
+
+
+class StubProvider(providers.Provider):
+    def __init__(self, name, latency=0.0, result=None, error=None):
+        self.name = name
+        self.latency = latency
+        self.result = result
+        self.error = error
+        self.calls = 0
+
+    def fetch(self, city, time_out=3):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.error:
+            raise self.error
+        return self.result if self.result is not None else observation(city, self.name)
+
+
+def observation(city, source):
+    return {"city": city, "weather": source, "temp": 300.0, "temp_min": 299.0,
+            "temp_max": 301.0, "pressure": 1013, "humidity": 70}
+
+
+@pytest.fixture
+def fetchers():
+    created = []
+
+    def make(*args, **kwargs):
+        fetcher = providers.HedgedFetcher(*args, **kwargs)
+        created.append(fetcher)
+        return fetcher
+
+    yield make
+    for fetcher in created:
+        fetcher.close()
+
+
+def test_fast_primary_is_not_hedged(fetchers):
+    primary = StubProvider("primary")
+    secondary = StubProvider("secondary")
+    fetcher = fetchers([primary, secondary], initial_hedge_delay=0.5)
+
+    assert fetcher.fetch("Delhi")["weather"] == "primary"
+    assert secondary.calls == 0
+    assert fetcher.stats["hedged"] == 0
+
+
+def test_slow_primary_is_hedged_to_secondary(fetchers):
+    primary = StubProvider("primary", latency=1.0)
+    secondary = StubProvider("secondary")
+    fetcher = fetchers([primary, secondary], initial_hedge_delay=0.05)
+
+    started = time.perf_counter()
+    result = fetcher.fetch("Delhi")
+
+    assert result["weather"] == "secondary"
+    assert time.perf_counter() - started < 0.5
+    assert fetcher.stats["hedged"] == 1
+    assert fetcher.stats["wins"] == {"secondary": 1}
+
+
+def test_single_provider_sends_duplicate(fetchers):
+    primary = StubProvider("primary", latency=0.2)
+    fetcher = fetchers([primary], initial_hedge_delay=0.05)
+
+    assert fetcher.fetch("Delhi")["city"] == "Delhi"
+    assert primary.calls == 2
+
+
+def test_failed_primary_fails_over(fetchers):
+    primary = StubProvider("primary", error=ServerError("500 Internal Server Error"))
+    secondary = StubProvider("secondary")
+    fetcher = fetchers([primary, secondary], initial_hedge_delay=5)
+
+    assert fetcher.fetch("Delhi")["weather"] == "secondary"
+
+
+def test_invalid_answer_is_ignored(fetchers):
+    primary = StubProvider("primary", result={"city": "Delhi", "temp": None})
+    secondary = StubProvider("secondary", latency=0.05)
+    fetcher = fetchers([primary, secondary], initial_hedge_delay=5)
+
+    assert fetcher.fetch("Delhi")["weather"] == "secondary"
+
+
+def test_all_failures_raise_primary_error(fetchers):
+    error = ServerError("500 Internal Server Error")
+    fetcher = fetchers([StubProvider("primary", error=error),
+                        StubProvider("secondary", error=ValueError("bad"))])
+
+    with pytest.raises(ServerError):
+        fetcher.fetch("Delhi")
+
+
+def test_hedge_delay_follows_primary_latency(fetchers):
+    fetcher = fetchers([StubProvider("primary")], hedge_percentile=90, min_samples=10, initial_hedge_delay=2.0)
+    assert fetcher.hedge_delay() == 2.0
+
+    fetcher.latencies.extend([0.01] * 9 + [0.5])
+
+    assert fetcher.hedge_delay() == 0.5
+    fetcher.latencies.extend([0.01] * 10)
+    assert fetcher.hedge_delay() == 0.01
+
+
+def test_failed_primary_calls_do_not_lower_hedge_delay(fetchers):
+    primary = StubProvider("primary", error=ServerError("503 Service Unavailable"))
+    fetcher = fetchers([primary, StubProvider("secondary")], min_samples=2, initial_hedge_delay=2.0)
+
+    for _ in range(5):
+        fetcher.fetch("Delhi")
+
+    assert len(fetcher.latencies) == 0
+    assert fetcher.hedge_delay() == 2.0
+
+
+def test_open_weather_map_provider_normalizes():
+    full = dict(observation("Delhi", "haze"), feels_like=303.0, sea_level=1013, grnd_level=1000)
+    with patch.object(providers, "fetch_weather", return_value=full) as mock_fetch:
+        result = providers.OpenWeatherMapProvider(key="key").fetch("Delhi", time_out=2)
+
+    assert result == observation("Delhi", "haze")
+    assert mock_fetch.call_args.kwargs["time_out"] == 2
+
+
+def test_open_meteo_provider_normalizes():
+    geocoding = MagicMock()
+    geocoding.json.return_value = {"results": [{"latitude": 28.65, "longitude": 77.23}]}
+    forecast = MagicMock()
+    forecast.json.return_value = {
+        "current": {"temperature_2m": 30.0, "relative_humidity_2m": 40, "pressure_msl": 1008.5, "weather_code": 3},
+        "daily": {"temperature_2m_max": [33.0], "temperature_2m_min": [25.0]}
+    }
+    provider = providers.OpenMeteoProvider()
+
+    with patch("requests.get", side_effect=[geocoding, forecast, forecast]) as mock_get:
+        result = provider.fetch("Delhi")
+        provider.fetch("Delhi")
+
+    assert result == {"city": "Delhi", "weather": "overcast clouds", "temp": 303.15, "pressure": 1008.5,
+                      "humidity": 40, "temp_min": 298.15, "temp_max": 306.15}
+    # coordinates are looked up once per city
+    assert mock_get.call_count == 3
+
+
+def test_normalized_keys_follow_csv_columns():
+    assert list(providers.NORMALIZED_KEYS) == [field for field in CSV_FIELDS if field in providers.NORMALIZED_KEYS]
+
+
+def test_provider_requires_fetch():
+    class Incomplete(providers.Provider):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -2,6 +2,7 @@ import sqlite3
 import pytest
 from src.readDB import read_all_data_from_db, DB_FILENAME
 import src.readDB as readDB
+from src.updateDB import create_tables, insert_city, insert_weather
 
 @pytest.fixture
 def setup_in_memory_db(monkeypatch):
@@ -51,7 +52,7 @@ def setup_in_memory_db(monkeypatch):
 
     conn.commit()
 
-    def connect_override(_filename):
+    def connect_override(*args, **kwargs):
         return conn
 
     monkeypatch.setattr(readDB.sqlite3, "connect", connect_override)
@@ -78,7 +79,7 @@ def test_read_all_data_from_db_output(setup_in_memory_db, capsys):
     assert "Humidity: 65" in output
 
 def test_database_error_handling(monkeypatch, capsys):
-    def raise_db_error(_):
+    def raise_db_error(*args, **kwargs):
         raise sqlite3.DatabaseError("Test DB error")
 
     monkeypatch.setattr(readDB.sqlite3, "connect", raise_db_error)
@@ -89,7 +90,7 @@ def test_database_error_handling(monkeypatch, capsys):
 
 
 def test_unexpected_exception_handling(monkeypatch, capsys):
-    def raise_general_error(_):
+    def raise_general_error(*args, **kwargs):
         raise Exception("Unexpected test error")
 
     monkeypatch.setattr(readDB.sqlite3, "connect", raise_general_error)
@@ -98,3 +99,17 @@ def test_unexpected_exception_handling(monkeypatch, capsys):
     captured = capsys.readouterr()
     assert "Unexpected error while reading data: Unexpected test error" in captured.out
 
+
+def test_read_latest_weather():
+    conn = sqlite3.connect(":memory:")
+    create_tables(conn)
+    for city, temp in (("Mumbai", 300.0), ("Mumbai", 301.0), ("Delhi", 305.0)):
+        insert_weather(conn, insert_city(conn, city), {
+            "weather": "Clear sky", "temp": temp, "pressure": 1013.0,
+            "humidity": 70.0, "temp_min": 298.0, "temp_max": 302.0
+        })
+
+    rows = readDB.read_latest_weather(conn)
+
+    assert [(row[0], row[2]) for row in rows] == [("Delhi", 305.0), ("Mumbai", 301.0)]
+    conn.close()
@@ -0,0 +1,124 @@
+import itertools
+import os
+import sqlite3
+import pytest
+from datetime import datetime
+from src.updateDB import create_tables, insert_city
+from src.db import ConnectionManager
+import src.retention as retention
+
+NOW = datetime(2025, 6, 15, 12, 0, 0)
+
+ROWS = [
+    ("Mumbai", "2025-03-02 10:00:00", 300.0),
+    ("Mumbai", "2025-03-20 10:00:00", 301.0),
+    ("Delhi", "2025-03-25 10:00:00", 305.0),
+    ("Delhi", "2025-04-10 10:00:00", 306.0),
+    ("Mumbai", "2025-06-01 10:00:00", 302.0),
+    ("Delhi", "2025-06-14 10:00:00", 307.0),
+]
+
+
+@pytest.fixture
+def populated_db(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "weather_data.db"))
+    create_tables(conn)
+    for city, date, temp in ROWS:
+        city_id = insert_city(conn, city)
+        conn.execute("""
+        INSERT INTO Weather (city_id, weather, temp, pressure, humidity, temp_min, temp_max, date)
+        VALUES (?, 'Clear sky', ?, 1013, 70, ?, ?, ?)
+        """, (city_id, temp, temp - 2, temp + 2, date))
+    conn.commit()
+    yield conn, str(tmp_path / "archive")
+    conn.close()
+
+
+def test_months_between():
+    assert retention.months_between("2024-11-20", "2025-02-01") == ["2024-11", "2024-12", "2025-01", "2025-02"]
+
+
+def test_archive_old_rows_moves_rows_per_month(populated_db):
+    conn, archive_dir = populated_db
+
+    moved = retention.archive_old_rows(conn, max_age_days=30, archive_dir=archive_dir, batch_size=1, now=NOW)
+
+    assert moved == 4
+    assert conn.execute("SELECT COUNT(*) FROM Weather").fetchone()[0] == 2
+    assert sorted(os.listdir(archive_dir)) == ["weather_2025-03.db", "weather_2025-04.db"]
+
+    archive = sqlite3.connect(os.path.join(archive_dir, "weather_2025-03.db"))
+    rows = archive.execute("""
+    SELECT c.name, w.temp FROM Weather w JOIN City c ON w.city_id = c.id ORDER BY w.date
+    """).fetchall()
+    archive.close()
+    assert rows == [("Mumbai", 300.0), ("Mumbai", 301.0), ("Delhi", 305.0)]
+
+
+def test_archive_old_rows_is_idempotent(populated_db):
+    conn, archive_dir = populated_db
+
+    retention.archive_old_rows(conn, max_age_days=30, archive_dir=archive_dir, now=NOW)
+    assert retention.archive_old_rows(conn, max_age_days=30, archive_dir=archive_dir, now=NOW) == 0
+
+
+def test_query_weather_range_spans_archives(populated_db):
+    conn, archive_dir = populated_db
+    retention.archive_old_rows(conn, max_age_days=30, archive_dir=archive_dir, now=NOW)
+
+    rows = retention.query_weather_range(conn, "2025-03-15", "2025-07-01", archive_dir=archive_dir)
+    assert [row[8] for row in rows] == [
+        "2025-03-20 10:00:00", "2025-03-25 10:00:00", "2025-04-10 10:00:00",
+        "2025-06-01 10:00:00", "2025-06-14 10:00:00"
+    ]
+
+    rows = retention.query_weather_range(conn, "2025-01-01", "2025-07-01", city="Delhi", archive_dir=archive_dir)
+    assert [row[3] for row in rows] == [305.0, 306.0, 307.0]
+
+
+def test_query_weather_range_on_reader_connection(populated_db, tmp_path):
+    conn, archive_dir = populated_db
+    retention.archive_old_rows(conn, max_age_days=30, archive_dir=archive_dir, now=NOW)
+
+    with ConnectionManager(str(tmp_path / "weather_data.db")) as manager, manager.reader() as reader:
+        rows = retention.query_weather_range(reader, "2025-03-01", "2025-04-01", archive_dir=archive_dir)
+
+    assert len(rows) == 3
+
+
+def test_iter_weather_range_merges_live_rows_into_archived_months(populated_db):
+    conn, archive_dir = populated_db
+    retention.archive_old_rows(conn, max_age_days=30, archive_dir=archive_dir, now=NOW)
+    # A late backfill for an archived month lands in the live table.
+    conn.execute("""
+    INSERT INTO Weather (city_id, weather, temp, pressure, humidity, temp_min, temp_max, date)
+    VALUES (?, 'Clear sky', 303.0, 1013, 70, 301.0, 305.0, '2025-03-10 10:00:00')
+    """, (insert_city(conn, "Pune"),))
+    conn.commit()
+
+    rows = retention.iter_weather_range(conn, "2025-03-01", "2025-07-01", archive_dir=archive_dir)
+    assert [row[3] for row in itertools.islice(rows, 2)] == [300.0, 303.0]
+    rows.close()
+
+    # Closing early detached the archive again.
+    assert "archive" not in [row[1] for row in conn.execute("PRAGMA database_list")]
+    assert [row[3] for row in retention.iter_weather_range(conn, "2025-03-01", "2025-07-01",
+                                                           archive_dir=archive_dir)] == [
+        300.0, 303.0, 301.0, 305.0, 306.0, 302.0, 307.0]
+
+
+def test_archive_month_batches_search_the_date_index(populated_db):
+    conn, archive_dir = populated_db
+    statements = []
+    conn.set_trace_callback(statements.append)
+    moved = retention.archive_month(conn, "2025-03", "2025-03-22", archive_dir, batch_size=1)
+    conn.set_trace_callback(None)
+
+    assert moved == 2
+    assert [row[0] for row in conn.execute("SELECT date FROM Weather WHERE date < '2025-04-01'")] == [
+        "2025-03-25 10:00:00"]
+
+    batch_select = next(sql for sql in statements if "INSERT INTO temp.archive_batch" in sql)
+    plan = " ".join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN " + batch_select[batch_select.index("SELECT"):]))
+    assert "idx_weather_date" in plan
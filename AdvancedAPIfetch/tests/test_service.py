@@ -0,0 +1,210 @@
+import gzip
+import json
+import sqlite3
+import threading
+import types
+import urllib.error
+import urllib.request
+import pytest
+from src.updateDB import create_tables, insert_city, insert_weather
+import src.service as service_module
+from src.service import ResultCache, WeatherService, create_server
+
+
+def add_weather(conn, city, temp, date):
+    city_id = insert_city(conn, city)
+    conn.execute("""
+    INSERT INTO Weather (city_id, weather, temp, pressure, humidity, temp_min, temp_max, date)
+    VALUES (?, 'Clear sky', ?, 1000, 50, ?, ?, ?)
+    """, (city_id, temp, temp - 1, temp + 1, date))
+    conn.commit()
+
+
+@pytest.fixture
+def server(tmp_path):
+    filename = str(tmp_path / "weather_data.db")
+    conn = sqlite3.connect(filename)
+    create_tables(conn)
+    add_weather(conn, "Mumbai", 300.0, "2025-06-01 10:00:00")
+    add_weather(conn, "Mumbai", 302.0, "2025-06-02 10:00:00")
+    add_weather(conn, "Delhi", 305.0, "2025-06-01 10:00:00")
+    # Backfills LatestWeather from the rows above.
+    create_tables(conn)
+
+    server = create_server(port=0, filename=filename, archive_dir=str(tmp_path / "archive"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server, conn
+
+    server.shutdown()
+    server.server_close()
+    server.service.close()
+    conn.close()
+
+
+def get(server, path, headers=None):
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {})) as response:
+        body = response.read()
+        if response.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return response.headers, json.loads(body)
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_latest(server):
+    server, _ = server
+    _, data = get(server, "/latest")
+
+    assert [(row["city"], row["temp"]) for row in data] == [("Delhi", 305.0), ("Mumbai", 302.0)]
+
+
+def test_range_and_aggregate(server):
+    server, _ = server
+    _, data = get(server, "/range?start=2025-06-01&end=2025-06-02&city=Mumbai")
+    assert [row["temp"] for row in data] == [300.0]
+
+    _, data = get(server, "/aggregate?start=2025-06-01&end=2025-07-01")
+    mumbai = next(row for row in data if row["city"] == "Mumbai")
+    assert mumbai["count"] == 2
+    assert mumbai["temp_avg"] == 301.0
+    assert mumbai["temp_max"] == 302.0
+
+
+def test_cache_invalidated_by_ingest(server):
+    server, conn = server
+    get(server, "/latest")
+    get(server, "/latest")
+    assert server.service.cache.hits == 1
+
+    insert_weather(conn, insert_city(conn, "Delhi"), {
+        "weather": "Haze", "temp": 310.0, "pressure": 1000.0,
+        "humidity": 40.0, "temp_min": 309.0, "temp_max": 311.0
+    })
+    _, data = get(server, "/latest")
+
+    assert next(row for row in data if row["city"] == "Delhi")["temp"] == 310.0
+
+
+def test_result_read_before_ingest_is_not_cached(server):
+    server, conn = server
+    service = WeatherService(server.service.filename, server.service.archive_dir)
+    try:
+        version = service.check_for_ingest()
+        stale = json.dumps(service.latest()).encode("utf-8")
+
+        # An ingest commits, and another request notices it, while the
+        # first request is still encoding its result.
+        add_weather(conn, "Delhi", 310.0, "2025-06-03 10:00:00")
+        current = service.check_for_ingest()
+        service.cache_result(("/latest", ()), stale, version)
+        assert service.cache.get(("/latest", ())) is None
+
+        service.cache_result(("/latest", ()), b"fresh", current)
+        assert service.cache.get(("/latest", ())) == b"fresh"
+    finally:
+        service.close()
+
+
+def test_streamed_gzip_range(server, monkeypatch):
+    server, conn = server
+    monkeypatch.setattr(service_module, "STREAM_MIN_ROWS", 2)
+    monkeypatch.setattr(service_module, "STREAM_CHUNK_ROWS", 1)
+
+    headers, data = get(server, "/range?start=2025-01-01&end=2026-01-01", {"Accept-Encoding": "gzip"})
+
+    assert headers["Transfer-Encoding"] == "chunked"
+    assert headers["Content-Encoding"] == "gzip"
+    assert [row["date"] for row in data] == ["2025-06-01 10:00:00", "2025-06-01 10:00:00", "2025-06-02 10:00:00"]
+
+
+def test_range_rows_are_streamed_from_the_cursor(server, monkeypatch):
+    server, _ = server
+    monkeypatch.setattr(service_module, "STREAM_MIN_ROWS", 2)
+    monkeypatch.setattr(service_module, "STREAM_CHUNK_ROWS", 1)
+    consumed = []
+    iter_weather_range = service_module.iter_weather_range
+
+    def tracking_iter(*args):
+        for row in iter_weather_range(*args):
+            consumed.append(row[0])
+            yield row
+    monkeypatch.setattr(service_module, "iter_weather_range", tracking_iter)
+
+    _, data = get(server, "/range?start=2025-01-01&end=2026-01-01")
+
+    assert [row["id"] for row in data] == consumed
+    assert isinstance(server.service.weather_range("2025-01-01", "2026-01-01"), types.GeneratorType)
+
+
+def test_errors(server):
+    server, _ = server
+    with pytest.raises(urllib.error.HTTPError) as e:
+        get(server, "/range")
+    assert e.value.code == 400
+
+    with pytest.raises(urllib.error.HTTPError) as e:
+        get(server, "/unknown")
+    assert e.value.code == 404
+
+
+def test_reader_connections_bounded_across_clients(server):
+    server, _ = server
+    # urlopen opens a new HTTP connection, and so a new handler thread, each
+    # time; distinct queries keep the result cache out of the way
+    for n in range(50):
+        get(server, f"/range?start=2025-06-01&end=2025-06-02&city=city-{n}")
+
+    assert len(server.service.manager._connections) <= 8
+
+
+def test_busy_reader_pool_answers_503(server):
+    server, _ = server
+    manager = server.service.manager
+    manager.reader_timeout = 0.05
+    held = [manager.reader() for _ in range(service_module.MAX_READERS)]
+    for reader in held:
+        reader.__enter__()
+    try:
+        with pytest.raises(urllib.error.HTTPError) as e:
+            get(server, "/latest")
+        assert e.value.code == 503
+    finally:
+        for reader in held:
+            reader.__exit__(None, None, None)
+
+    _, data = get(server, "/latest")
+    assert len(data) == 2
+
+
+def test_streams_are_capped_separately_from_readers(server, monkeypatch):
+    server, _ = server
+    monkeypatch.setattr(service_module, "STREAM_MIN_ROWS", 2)
+    slots = server.service.stream_slots
+    while slots.acquire(blocking=False):
+        pass
+    try:
+        with pytest.raises(urllib.error.HTTPError) as e:
+            get(server, "/range?start=2025-01-01&end=2026-01-01")
+        assert e.value.code == 503
+        # short queries still get a reader
+        _, data = get(server, "/range?start=2025-06-01&end=2025-06-02&city=Mumbai")
+        assert [row["temp"] for row in data] == [300.0]
+    finally:
+        for _ in range(service_module.MAX_STREAMS):
+            slots.release()
+
+    _, data = get(server, "/range?start=2025-01-01&end=2026-01-01")
+    assert len(data) == 3
@@ -0,0 +1,65 @@
+import csv
+import sqlite3
+import src.updateDB as updateDB
+from src.csvio import open_csv
+from src.readDB import read_latest_weather
+from src.synthetic import generate_rows, write_csv, city_names
+
+
+def test_generate_rows_is_deterministic():
+    first = list(generate_rows(5, 10, seed=3, malformed_rate=0.2))
+    second = list(generate_rows(5, 10, seed=3, malformed_rate=0.2))
+    other = list(generate_rows(5, 10, seed=4, malformed_rate=0.2))
+
+    assert len(first) == 50
+    assert first == second
+    assert first != other
+
+
+def test_generate_rows_values_are_realistic():
+    for row in generate_rows(10, 48, seed=1):
+        assert 230 < row["temp"] < 330
+        assert row["temp_min"] <= row["temp"] <= row["temp_max"]
+        assert 5 <= row["humidity"] <= 100
+        assert 950 < row["pressure"] < 1080
+
+
+def test_city_names_extend_past_known_cities():
+    names = city_names(45)
+
+    assert names[0] == "Bengaluru"
+    assert names[-1] == "City-00044"
+    assert len(set(names)) == 45
+
+
+def test_malformed_rows_are_dead_lettered(tmp_path, monkeypatch):
+    filename = str(tmp_path / "weather.csv.gz")
+    assert write_csv(filename, 10, 50, seed=2, malformed_rate=0.1) == 500
+
+    with open_csv(filename) as file:
+        rows = list(csv.DictReader(file))
+    malformed = 0
+    for row in rows:
+        try:
+            updateDB.parse_weather_row(row)
+        except ValueError:
+            malformed += 1
+    assert 25 <= malformed <= 80
+
+    monkeypatch.setattr(updateDB, "CSV_FILENAME", filename)
+    conn = sqlite3.connect(":memory:")
+    updateDB.create_tables(conn)
+    updateDB.write_weather_data_to_db(conn)
+
+    assert conn.execute("SELECT COUNT(*) FROM Weather").fetchone()[0] == 500 - malformed
+    conn.close()
+
+
+def test_synthetic_db_fixture(synthetic_db):
+    conn = sqlite3.connect(synthetic_db)
+
+    assert conn.execute("SELECT COUNT(*) FROM Weather").fetchone()[0] == 20 * 48
+    latest = read_latest_weather(conn)
+    assert len(latest) == 20
+    assert {row[7] for row in latest} == {"2025-01-02 23:00:00"}
+    conn.close()
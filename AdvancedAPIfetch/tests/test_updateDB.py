@@ -221,3 +221,67 @@ def test_insert_weather_database_error(monkeypatch):
 
     with pytest.raises(sqlite3.DatabaseError):
         insert_weather(conn, 1, weather_data)
+
+def latest_rows(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT city_id, weather_id, temp FROM LatestWeather ORDER BY city_id")
+    return cursor.fetchall()
+
+def test_insert_weather_updates_latest(db_connection):
+    create_tables(db_connection)
+    city_id = insert_city(db_connection, "Mumbai")
+
+    for temp in (300.0, 301.0):
+        insert_weather(db_connection, city_id, {
+            "weather": "Clear sky", "temp": temp, "pressure": 1013.0,
+            "humidity": 70.0, "temp_min": 298.0, "temp_max": 302.0
+        })
+
+    assert latest_rows(db_connection) == [(city_id, 2, 301.0)]
+
+def test_insert_weather_batch_updates_latest(db_connection):
+    create_tables(db_connection)
+    mumbai = insert_city(db_connection, "Mumbai")
+    delhi = insert_city(db_connection, "Delhi")
+
+    def weather(temp):
+        return {"weather": "Clear sky", "temp": temp, "pressure": 1013.0,
+                "humidity": 70.0, "temp_min": 298.0, "temp_max": 302.0}
+
+    updateDB.insert_weather_batch(db_connection, [(mumbai, weather(300.0)), (delhi, weather(305.0))])
+    updateDB.insert_weather_batch(db_connection, [(mumbai, weather(301.0)), (mumbai, weather(302.0))])
+
+    assert latest_rows(db_connection) == [(mumbai, 4, 302.0), (delhi, 2, 305.0)]
+    assert db_connection.execute("SELECT COUNT(*) FROM Weather").fetchone()[0] == 4
+
+def test_create_tables_backfills_latest(db_connection):
+    cursor = db_connection.cursor()
+    cursor.execute("CREATE TABLE City (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL)")
+    cursor.execute("""
+    CREATE TABLE Weather (id INTEGER PRIMARY KEY AUTOINCREMENT, city_id INTEGER, weather TEXT, temp REAL,
+        pressure REAL, humidity REAL, temp_min REAL, temp_max REAL, date TIMESTAMP DEFAULT CURRENT_TIMESTAMP)
+    """)
+    cursor.execute("INSERT INTO City (name) VALUES ('Mumbai')")
+    cursor.executemany("INSERT INTO Weather (city_id, weather, temp) VALUES (1, 'Clear sky', ?)", [(300,), (301,)])
+    db_connection.commit()
+
+    create_tables(db_connection)
+
+    assert latest_rows(db_connection) == [(1, 2, 301.0)]
+
+def test_write_weather_data_to_db_batches(monkeypatch, db_connection):
+    create_tables(db_connection)
+    monkeypatch.setattr(updateDB.os.path, "exists", lambda _: True)
+    monkeypatch.setattr("builtins.open", mock_open(read_data=CSV_CONTENT))
+
+    batches = []
+    insert_weather_batch = updateDB.insert_weather_batch
+    def recording_batch(conn, batch):
+        batches.append(len(batch))
+        insert_weather_batch(conn, batch)
+    monkeypatch.setattr(updateDB, "insert_weather_batch", recording_batch)
+
+    write_weather_data_to_db(db_connection, batch_size=1)
+
+    assert batches == [1, 1]
+    assert [row[2] for row in latest_rows(db_connection)] == [300.0, 305.0]
@@ -1,7 +1,38 @@
 import requests
 import csv
+import gzip
 import os
 import random
+import shutil
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def decode_json(response):
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+# stocks.csv.gz: each run's rows go to a plain stocks.csv.gz.tail, which is
+# compressed into one new gzip member once it holds SEGMENT_BYTES. A member
+# per run would be larger than the plain text.
+SEGMENT_BYTES = 64 * 1024
+
+def append_rows(filename, rows):
+    path = f"{filename}.tail" if filename.endswith(".gz") else filename
+    file_exists = os.path.exists(filename) or os.path.exists(path)
+    with open(path, mode="a" if file_exists else "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=rows[0].keys())
+        if not file_exists:
+            writer.writeheader()
+        writer.writerows(rows)
+
+    if path != filename and os.path.getsize(path) >= SEGMENT_BYTES:
+        with open(path, mode="rb") as tail, gzip.open(filename, mode="ab") as segment:
+            shutil.copyfileobj(tail, segment)
+        os.remove(path)
 
 def fetch_stocks(num_stocks=1, time_out=3):
     url = "https://api.freeapi.app/api/v1/public/stocks"
@@ -22,7 +53,7 @@ def fetch_stocks(num_stocks=1, time_out=3):
     if "charset=utf-8" not in response.headers["Content-type"]:
         raise Exception("Invalid encoding format")
 
-    response = response.json()
+    response = decode_json(response)
     
     if response["success"] and "data" in response:
         data = response["data"]["data"]
@@ -38,19 +69,10 @@ def main():
     try:
         stock_data = fetch_stocks(num_stocks=5, time_out=1)
 
-        filename = "stocks.csv"
-        file_exists = os.path.exists(filename)
+        filename = os.getenv("STOCKS_CSV", "stocks.csv")
 
         print(stock_data)
-        with open(filename, 
-                    mode="a" if file_exists else "w",
-                    encoding="utf-8",
-                    newline="") as file:
-            writer = csv.DictWriter(file, fieldnames=stock_data[0].keys())
-            
-            if not file_exists:
-                writer.writeheader()
-            writer.writerows(stock_data)
+        append_rows(filename, stock_data)
 
     except requests.exceptions.Timeout:
         print("API call timed out")